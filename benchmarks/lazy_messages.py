@@ -0,0 +1,47 @@
+"""Compares building eager :class:`Message` and :class:`LazyMessage` objects.
+
+Every message carries a reply chain two levels deep. The first case only reads
+``.text``, the second reads the attributes event routing looks at plus the chat
+and the user. Run it with ``tg_botting`` importable, e.g. after ``pip install -e .``::
+
+    python benchmarks/lazy_messages.py
+"""
+import json
+import time
+
+from tg_botting.message import Message, LazyMessage
+
+
+USER = {'id': 1, 'is_bot': False, 'first_name': 'A', 'username': 'a', 'language_code': 'en'}
+CHAT = {'id': -100, 'type': 'supergroup', 'title': 'T', 'username': 'g'}
+BASE = {'message_id': 5, 'from': USER, 'chat': CHAT, 'date': 1700000000, 'text': '/start hello world',
+        'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}]}
+UPDATE = json.dumps(dict(BASE, reply_to_message=dict(BASE, pinned_message=dict(BASE)), edit_date=1700000100))
+COUNT = 20000
+
+
+def read_text(msg):
+    return msg.text
+
+
+def read_routing(msg):
+    return (msg.sticker, msg.audio, msg.video, msg.video_note, msg.voice, msg.poll, msg.left_chat_member,
+            msg.photo, msg.new_chat_members, msg.successful_payment, msg.text, msg.chat.id, msg.user.id)
+
+
+def bench(cls, touch):
+    # Decoded up front, so only building and reading the message is timed
+    updates = [json.loads(UPDATE) for _ in range(COUNT)]
+    start = time.perf_counter()
+    for data in updates:
+        touch(cls(data))
+    return (time.perf_counter() - start) / COUNT * 1e6
+
+
+def main():
+    for name, touch in (('reads .text only', read_text), ('routing + .chat/.user', read_routing)):
+        print('{:<24} eager {:7.1f}us  lazy {:7.1f}us'.format(name, bench(Message, touch), bench(LazyMessage, touch)))
+
+
+if __name__ == '__main__':
+    main()
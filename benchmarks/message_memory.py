@@ -0,0 +1,113 @@
+"""Measures the memory and construction time of retained :class:`Message` objects.
+
+The decoded updates are allocated before tracing starts, so only the objects
+built from them are counted. For the comparison with a layout without
+``__slots__``, every object of the message tree is rebuilt twice with the same
+attribute values: once slotted and once as an instance of a plain class that
+keeps them in a per-instance ``__dict__``. The difference between the two is
+added to the measured size, which gives the size the tree had before.
+
+Recorded with CPython 3.11 on the same data: 2649 bytes per Message just before
+the slotted layout was introduced, 1456 bytes after it.
+
+Run it with ``tg_botting`` importable, e.g. after ``pip install -e .``::
+
+    python benchmarks/message_memory.py
+"""
+import gc
+import json
+import time
+import tracemalloc
+
+from tg_botting.message import Message
+from tg_botting.schema import TGObject
+from tg_botting.utils import attributes
+
+
+USER = {'id': 1, 'is_bot': False, 'first_name': 'A', 'username': 'a', 'language_code': 'en'}
+CHAT = {'id': -100, 'type': 'supergroup', 'title': 'T', 'username': 'g'}
+UPDATE = json.dumps({'message_id': 5, 'from': USER, 'chat': CHAT, 'date': 1700000000, 'text': '/start hello world',
+                     'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}]})
+COUNT = 5000
+
+_plain_classes = {}
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    built = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return current
+
+
+def tree(obj):
+    """Returns every TG object reachable from ``obj``, ``obj`` included."""
+    found = []
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, TGObject):
+            found.append(value)
+            stack.extend(attributes(value).values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return found
+
+
+def rebuild_slotted(obj):
+    cls = type(obj)
+    new = cls.__new__(cls)
+    for name, value in attributes(obj).items():
+        object.__setattr__(new, name, value)
+    return new
+
+
+def rebuild_plain(obj):
+    cls = type(obj)
+    try:
+        plain = _plain_classes[cls]
+    except KeyError:
+        plain = _plain_classes[cls] = type(cls.__name__, (), {})
+    new = plain()
+    for name, value in attributes(obj).items():
+        setattr(new, name, value)
+    return new
+
+
+def measure_memory():
+    updates = [json.loads(UPDATE) for _ in range(COUNT)]
+    slotted = traced(lambda: [Message(data) for data in updates]) / COUNT
+
+    objects = [obj for data in updates for obj in tree(Message(data))]
+    # Warms up the plain classes, so creating them is not counted
+    for obj in objects[:100]:
+        rebuild_plain(obj)
+    layout = traced(lambda: [rebuild_plain(obj) for obj in objects]) - \
+        traced(lambda: [rebuild_slotted(obj) for obj in objects])
+    return slotted, slotted + layout / COUNT
+
+
+def measure_construction(runs=5):
+    best = float('inf')
+    for _ in range(runs):
+        updates = [json.loads(UPDATE) for _ in range(COUNT)]
+        start = time.perf_counter()
+        for data in updates:
+            Message(data)
+        best = min(best, (time.perf_counter() - start) / COUNT * 1e6)
+    return best
+
+
+def main():
+    slotted, unslotted = measure_memory()
+    print('bytes per retained Message: {:.0f} slotted, {:.0f} with per-instance __dict__ ({:.0%} saved)'.format(
+        slotted, unslotted, 1 - slotted / unslotted))
+    print('construction: {:.1f}us per Message (best of 5)'.format(measure_construction()))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,12 @@ from .user import *
 from .utils import *
 from .permissions import *
 from .objects import *
+from .cooldowns import CooldownStore, MemoryCooldownStore, SQLiteCooldownStore
+from .identity import IdentityMap
+from .metrics import MetricsRegistry
+from .offsets import OffsetStore, MemoryOffsetStore, FileOffsetStore
+from .retry import RetryPolicy, CircuitBreaker
+from .scheduler import SendScheduler
 
 
 VersionInfo = namedtuple('VersionInfo', 'major minor micro releaselevel serial')
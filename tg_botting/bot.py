@@ -1,9 +1,11 @@
 import asyncio
 import collections
+import functools
 import importlib
 import inspect
 import re
 import sys
+import time
 import traceback
 import types
 
@@ -13,18 +15,31 @@ from tg_botting.commands import GroupMixin
 from tg_botting.context import Context
 from tg_botting.exceptions import ExtensionFailed, NoEntryPointError, ExtensionAlreadyLoaded, ExtensionNotFound, \
     ExtensionNotLoaded, CommandError, CommandNotFound
-from tg_botting.utils import async_all, maybe_coroutine, find
+from tg_botting.metrics import MetricsRegistry
+from tg_botting.utils import maybe_coroutine, run_checks
 from tg_botting.view import StringView
 
 
+def _mention_prefixes(bot):
+    # Built once per bot username instead of for every message
+    username = bot.group.username
+    cached = bot._mention_prefixes
+    if cached is None or cached[0] != username:
+        cached = bot._mention_prefixes = (username, ('@{}, '.format(username), '@{} '.format(username)))
+    return cached[1]
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_prefixes(prefixes):
+    # Alternatives are tried from left to right, so the first matching prefix of the list wins
+    return re.compile('|'.join(map(re.escape, prefixes)))
+
+
 def when_mentioned(bot, msg):
     r"""A callable that implements a command prefix equivalent to being mentioned.
     These are meant to be passed into the :attr:`.Bot.command_prefix` attribute.
     """
-    match = re.match(r'\[club{}\|[^]]+],? '.format(bot.group.id), msg.text)
-    if match and msg.text.startswith(match.group()):
-        return [match.group()]
-    return ['[club{0.group.id}|@{0.group.screen_name}] '.format(bot), '[club{0.group.id}|{0.group.name}] '.format(bot)]
+    return list(_mention_prefixes(bot))
 
 
 def when_mentioned_or(*prefixes):
@@ -46,7 +61,7 @@ def when_mentioned_or(*prefixes):
         .. code-block:: python3
 
             async def get_prefix(bot, message):
-                extras = await prefixes_for(message.peer_id) # returns a list
+                extras = await prefixes_for(message.chat.id) # returns a list
                 return commands.when_mentioned_or(*extras)(bot, message)
 
 
@@ -86,7 +101,7 @@ def when_mentioned_or_pm():
 
     def inner(bot, msg):
         r = when_mentioned(bot, msg)
-        if msg.peer_id == msg.from_id:
+        if msg.chat.type == 'private':
             r.append('')
         return r
 
@@ -112,7 +127,7 @@ def when_mentioned_or_pm_or(*prefixes):
         .. code-block:: python3
 
             async def get_prefix(bot, message):
-                extras = await prefixes_for(message.peer_id) # returns a list
+                extras = await prefixes_for(message.chat.id) # returns a list
                 return commands.when_mentioned_or(*extras)(bot, message)
 
 
@@ -125,7 +140,7 @@ def when_mentioned_or_pm_or(*prefixes):
 
     def inner(bot, msg):
         r = when_mentioned(bot, msg) + list(prefixes)
-        if msg.peer_id == msg.from_id:
+        if msg.chat.type == 'private':
             r.append('')
         return r
 
@@ -149,6 +164,14 @@ class BotBase(GroupMixin):
         self._after_invoke = None
         self.description = inspect.cleandoc(description) if description else ''
         self.owner_id = options.get('owner_id')
+        self.concurrent_checks = options.get('concurrent_checks', False)
+        self.cooldown_store = options.get('cooldown_store', None)
+        self.command_timeout = options.get('command_timeout', None)
+        self.metrics = options.get('metrics', MetricsRegistry())
+        self.prefix_cache_ttl = options.get('prefix_cache_ttl', None)
+        self.prefix_cache_size = options.get('prefix_cache_size', 10000)
+        self._prefix_cache = collections.OrderedDict()
+        self._mention_prefixes = None
 
         if options.pop('self_bot', False):
             self._skip_check = lambda x, y: x != y
@@ -219,7 +242,7 @@ class BotBase(GroupMixin):
         if len(data) == 0:
             return True
 
-        return await async_all(f(ctx) for f in data)
+        return await run_checks(ctx, data, concurrent=self.concurrent_checks)
 
     def before_invoke(self, coro):
         if not asyncio.iscoroutinefunction(coro):
@@ -245,6 +268,7 @@ class BotBase(GroupMixin):
             self.extra_events[name].append(func)
         else:
             self.extra_events[name] = [func]
+        self._add_consumer(name)
 
     def remove_listener(self, func, name=None):
         name = func.__name__ if name is None else name
@@ -254,6 +278,8 @@ class BotBase(GroupMixin):
                 self.extra_events[name].remove(func)
             except ValueError:
                 pass
+            else:
+                self._remove_consumer(name)
 
     def listen(self, name=None):
         def decorator(func):
@@ -293,13 +319,14 @@ class BotBase(GroupMixin):
                     cmd.recursively_remove_all_commands()
                 self.remove_command(cmd.name)
 
-        for event_list in self.extra_events.copy().values():
+        for event_name, event_list in self.extra_events.copy().items():
             remove = []
             for index, event in enumerate(event_list):
                 if event.__module__ is not None and _is_submodule(name, event.__module__):
                     remove.append(index)
 
             for index in reversed(remove):
+                self._remove_consumer(event_name)
                 del event_list[index]
 
     def _call_module_finalizers(self, lib, key):
@@ -468,7 +495,10 @@ class BotBase(GroupMixin):
         """
         prefix = ret = self.command_prefix
         if callable(prefix):
-            ret = await maybe_coroutine(prefix, self, message)
+            if self.prefix_cache_ttl is None:
+                ret = await maybe_coroutine(prefix, self, message)
+            else:
+                ret = await self._get_cached_prefix(prefix, message)
 
         if not isinstance(ret, str):
             try:
@@ -485,6 +515,35 @@ class BotBase(GroupMixin):
 
         return ret
 
+    async def _get_cached_prefix(self, prefix, message):
+        chat_id = message.chat.id
+        now = time.monotonic()
+        cache = self._prefix_cache
+        entry = cache.get(chat_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        ret = await maybe_coroutine(prefix, self, message)
+        cache.pop(chat_id, None)
+        cache[chat_id] = (now + self.prefix_cache_ttl, ret)
+        # Entries are kept in the order they were stored, which is also the order they expire in
+        while cache and (len(cache) > self.prefix_cache_size or next(iter(cache.values()))[0] <= now):
+            cache.popitem(last=False)
+        return ret
+
+    def invalidate_prefix(self, chat_id=None):
+        """Drops the cached prefixes of a chat, so the next message there calls
+        :attr:`command_prefix` again. Call it after changing the prefixes of a chat.
+
+        Parameters
+        -----------
+        chat_id: Optional[:class:`int`]
+            The chat to drop the prefixes of. Drops the prefixes of all chats if not given.
+        """
+        if chat_id is None:
+            self._prefix_cache.clear()
+        else:
+            self._prefix_cache.pop(chat_id, None)
+
     async def get_context(self, message, *, cls=Context):
         view = StringView(message.text)
         ctx = cls(prefix=None, view=view, bot=self, message=message)
@@ -500,11 +559,7 @@ class BotBase(GroupMixin):
                 return ctx
         else:
             try:
-                if message.text.startswith(tuple(prefix)):
-                    invoked_prefix = find(view.skip_string, prefix)
-                else:
-                    return ctx
-
+                match = _compile_prefixes(tuple(prefix)).match(message.text)
             except TypeError:
                 if not isinstance(prefix, list):
                     raise TypeError("get_prefix must return either a string or a list of string, "
@@ -517,20 +572,15 @@ class BotBase(GroupMixin):
 
                 raise
 
-        msg = view.read_rest()
-        view.undo()
-        # This is by far the fastest method there is as far as my knowledge extends
-        # Considering VK message length limit is 4096 it is at most 2048 iterations which is at most about 50 ms
-        # If not exaggerating the length of user messages this is the most optimal way imo
-        # It also works well with several commands having the same beginning as it will always choose the longest one
-        commands = set(self.all_commands) if not self.case_insensitive else self.all_commands
-        words = msg.split(' ')
-        for wordamt in range(len(words), 1, -1):
-            potcomm = ' '.join(words[:wordamt])
-            if potcomm in commands:
-                invoker = potcomm
-                view.read(len(invoker))
-                break
+            if match is None:
+                return ctx
+            invoked_prefix = match.group()
+            view.skip_string(invoked_prefix)
+
+        # The longest command name wins, so several commands can share their first words
+        length = self._command_trie.longest_prefix(view.buffer, view.index)
+        if length:
+            invoker = view.read(length)
         else:
             invoker = view.get_word()
         ctx.invoked_with = invoker
@@ -551,10 +601,17 @@ class BotBase(GroupMixin):
         """
         if ctx.command is not None:
             self.dispatch('command', ctx)
+            metrics = self.metrics
+            if metrics is not None:
+                labels = (('command', ctx.command.qualified_name),)
+                metrics.inc('command_calls_total', labels)
             try:
                 if await self.can_run(ctx, call_once=True):
                     await ctx.command.invoke(ctx)
             except CommandError as exc:
+                if metrics is not None:
+                    error = type(getattr(exc, 'original', exc)).__name__
+                    metrics.inc('command_errors_total', labels + (('error', error),))
                 await ctx.command.dispatch_error(ctx, exc)
             else:
                 self.dispatch('command_completion', ctx)
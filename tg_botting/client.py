@@ -1,25 +1,65 @@
 import asyncio
+import collections
 import enum
+import functools
+import hmac
 import json
 import sys
 import textwrap
+import time
 import traceback
 import typing
 from typing import TypeVar
 import datetime
 import aiohttp
+from aiohttp import web
 
-from tg_botting.exceptions import TGException, TGApiError, BadArgument
+from tg_botting.exceptions import TGException, TGApiError, BadArgument, CircuitBreakerOpen, AmbiguousRequestError
 from tg_botting.general import convert_params
-from tg_botting.message import Chat, Message, CallbackQuery, ChatJoinRequest, ChatJoinRequest
+from tg_botting.message import Chat, Message, LazyMessage, CallbackQuery, ChatJoinRequest, ChatMemberUpdated
+from tg_botting.offsets import FileOffsetStore
+from tg_botting.pipeline import UpdatePipeline
+from tg_botting.retry import RetryPolicy, is_idempotent, is_connect_error
+from tg_botting.scheduler import SendScheduler
 from tg_botting.objects import get_chat_member, MessageEntity, InlineKeyboardMarkup, ReplyKeyboardMarkup, \
     ReplyKeyboardRemove, InlineQuery, ChosenInlineResult, ShippingQuery, PreCheckoutQuery, Poll,PollAnswer
 
 from tg_botting.user import User
-from tg_botting.utils import to_json, maybe_coroutine
+from tg_botting.utils import to_json, DataView
 
 
 
+# Messages carrying one of these are dispatched as the paired event instead of message_new, first match wins
+_MESSAGE_EVENTS = (
+    ('sticker', 'sticker_new'),
+    ('audio', 'audio_new'),
+    ('video', 'video_new'),
+    ('video_note', 'video_note_new'),
+    ('voice', 'voice_new'),
+    ('poll', 'poll_new'),
+    ('left_chat_member', 'chat_member_left'),
+    ('photo', 'photo_new'),
+    ('new_chat_members', 'new_chat_members'),
+    ('successful_payment', 'successful_payment'),
+)
+
+# getUpdates is called in a loop that backs off on its own, so each poll is a single attempt
+_LONGPOLL_POLICY = RetryPolicy(max_attempts=1)
+
+
+def _listener_key(obj):
+    # The chat and the user an update came from, read from the raw data so lazy objects are not parsed
+    data = getattr(obj, 'original_data', None)
+    if data is None:
+        return None
+    chat = data.get('chat')
+    if chat is None:
+        message = data.get('message')
+        chat = message.get('chat') if message is not None else None
+    user = data.get('from')
+    return chat.get('id') if chat is not None else None, user.get('id') if user is not None else None
+
+
 String = TypeVar('String', bound=str)
 Integer = TypeVar('Integer', bound=int)
 Float = TypeVar('Float', bound=float)
@@ -69,7 +109,35 @@ class Client:
         self.key = None
         self.server = None
         self.offset = 0
+        self.longpoll_timeout = kwargs.get('longpoll_timeout', 30)
+        self.longpoll_limit = kwargs.get('longpoll_limit', 100)
+        self.allowed_updates = kwargs.get('allowed_updates', None)
+        self.send_scheduler = kwargs.get('send_scheduler', SendScheduler())
+        self.retry_policy = kwargs.get('retry_policy', RetryPolicy())
+        self.retry_policies = kwargs.get('retry_policies', {})
+        self.circuit_breaker = kwargs.get('circuit_breaker', None)
+        self.pipeline = UpdatePipeline(self, kwargs.get('workers', 16), kwargs.get('update_queue_size', 100),
+                                       kwargs.get('ordered_dispatch', False))
+        self.lazy_messages = kwargs.get('lazy_messages', False)
+        self.identity_map = kwargs.get('identity_map', None)
+        self.offset_store = kwargs.get('offset_store', None)
+        self.inflight_poll_interval = kwargs.get('inflight_poll_interval', 0.5)
+        self.backlog = kwargs.get('backlog', 'replay')
+        if self.backlog not in ('drain', 'skip', 'replay'):
+            raise TGException('backlog must be one of drain, skip or replay')
+        self.backlog_window = kwargs.get('backlog_window', 5)
+        self.webhook_secret = None
+        self.webhook_runner = None
+        self._inflight = collections.OrderedDict()
+        self._fetched = 0
+        self._backlog_cutoff = None
+        self._progress = asyncio.Event()
+        self._commit_scheduled = False
         self._listeners = {}
+        self._keyed_listeners = {}
+        self._consumers = {}
+        self._method_names = {}
+        self._collected = None
         timeout = aiohttp.ClientTimeout(total=100, connect=10)
         user_agent = kwargs.get('user_agent', None)
         if user_agent:
@@ -93,46 +161,60 @@ class Client:
         self.extra_events = []
         self.token = None
         self.user_token = None
-        self.event_handlers = {
-            'callback_query': self.handle_callback_query,
-            'message_reply': self.handle_message_reply,
-            'message_edit': self.handle_message_edit,
-            'sticker': self.handle_sticker_new,
-            # 'message_typing_state': self.handle_message_typing_state,
-            # 'message_allow': self.handle_message_allow,
-            # 'message_deny': self.handle_message_allow,
-            # 'photo_new': self.handle_photo_new,
-            # 'photo_comment_new': self.handle_photo_comment_new,
-            # 'photo_comment_edit': self.handle_photo_comment_new,
-            # 'photo_comment_restore': self.handle_photo_comment_new,
-            # 'photo_comment_delete': self.handle_photo_comment_delete,
-            # 'audio_new': self.handle_audio_new,
-            # 'video_new': self.handle_video_new,
-            # 'video_comment_new': self.handle_video_comment_new,
-            # 'video_comment_edit': self.handle_video_comment_new,
-            # 'video_comment_restore': self.handle_video_comment_new,
-            # 'video_comment_delete': self.handle_video_comment_delete,
-            # 'wall_post_new': self.handle_wall_post_new,
-            # 'wall_repost': self.handle_wall_post_new,
-            # 'wall_reply_new': self.handle_wall_reply_new,
-            # 'wall_reply_edit': self.handle_wall_reply_new,
-            # 'wall_reply_restore': self.handle_wall_reply_new,
-            # 'wall_reply_delete': self.handle_wall_reply_delete,
-            # 'board_post_new': self.handle_board_post_new,
-            # 'board_post_edit': self.handle_board_post_new,
-            # 'board_post_restore': self.handle_board_post_new,
-            # 'board_post_delete': self.handle_board_post_delete,
-            # 'market_comment_new': self.handle_market_comment_new,
-            # 'market_comment_edit': self.handle_market_comment_new,
-            # 'market_comment_restore': self.handle_market_comment_new,
-            # 'market_comment_delete': self.handle_market_comment_delete,
-            # 'group_leave': self.handle_group_leave,
-            # 'group_join': self.handle_group_join,
-            # 'user_block': self.handle_user_block,
-            # 'user_unblock': self.handle_user_unblock,
-            # 'poll_vote_new': self.handle_poll_vote_new,
-            # 'group_officers_edit': self.handle_group_officers_edit,
-        }
+        self.update_types = {}
+        self.register_update_type('message', None, self._route_message, 'message_new')
+        self.register_update_type('callback_query', self.build_callback_query)
+        self.register_update_type('inline_query', InlineQuery)
+        self.register_update_type('chosen_inline_result', ChosenInlineResult)
+        self.register_update_type('shipping_query', ShippingQuery)
+        self.register_update_type('pre_checkout_query', PreCheckoutQuery)
+        self.register_update_type('poll', Poll)
+        self.register_update_type('poll_answer', PollAnswer)
+        self.register_update_type('my_chat_member', ChatMemberUpdated)
+        self.register_update_type('chat_member', ChatMemberUpdated)
+        self.register_update_type('chat_join_request', ChatJoinRequest)
+
+    def _add_consumer(self, name):
+        self._consumers[name] = self._consumers.get(name, 0) + 1
+
+    def _remove_consumer(self, name, count=1):
+        left = self._consumers.get(name, 0) - count
+        if left > 0:
+            self._consumers[name] = left
+        else:
+            self._consumers.pop(name, None)
+
+    def has_consumers(self, event):
+        """Whether dispatching ``event`` would reach anything: an ``on_`` method,
+        a listener or a :meth:`wait_for` call. Updates for events nobody consumes are
+        dropped before they are parsed."""
+        try:
+            name = self._method_names[event]
+        except KeyError:
+            name = self._method_names[event] = 'on_' + event
+        return name in self._consumers or hasattr(self, name)
+
+    def register_update_type(self, update_type, parser=None, handler=None, event=None):
+        """Registers how updates of a type are handled.
+
+        Can be used to handle update types added to the Bot API after this library
+        was written, or to change how a known type is handled.
+
+        Parameters
+        ----------
+        update_type: :class:`str`
+            The key of the update object, e.g. ``'edited_message'``.
+        parser: Optional[Callable]
+            Called with the update object, its result is dispatched. The object is
+            dispatched as is if not given.
+        handler: Optional[Callable]
+            Called with the event name and the parsed object instead of dispatching it.
+            It is called even if nothing consumes the event, so it must check
+            :meth:`has_consumers` itself.
+        event: Optional[:class:`str`]
+            Name of the dispatched event. Defaults to ``update_type``.
+        """
+        self.update_types[update_type] = (parser, handler, event or update_type)
 
     def Payload(self, **kwargs):
         kwargs['access_token'] = self.token
@@ -147,7 +229,7 @@ class Client:
     class botCommandException(Exception):
         pass
 
-    def wait_for(self, event, *, check=None, timeout=None):
+    def wait_for(self, event, *, check=None, timeout=None, key=None):
         """|coro|
 
         Waits for an event to be dispatched.
@@ -174,9 +256,9 @@ class Client:
             async def greet(ctx):
                 await ctx.send('Say hello!')
                 def check(m):
-                    return m.text == 'hello' and m.from_id == ctx.from_id
-                msg = await bot.wait_for('message_new', check=check)
-                await ctx.send('Hello {.from_id}!'.format(msg))
+                    return m.text == 'hello'
+                msg = await bot.wait_for('message_new', check=check, key=(ctx.chat.id, ctx.user.id))
+                await ctx.send('Hello {.user.first_name}!'.format(msg))
 
         Parameters
         ------------
@@ -189,6 +271,10 @@ class Client:
         timeout: Optional[:class:`float`]
             The number of seconds to wait before timing out and raising
             :exc:`asyncio.TimeoutError`.
+        key: Optional[Tuple[Optional[:class:`int`], Optional[:class:`int`]]]
+            A ``(chat_id, user_id)`` pair the event must come from. Either may be ``None``
+            to match any chat or any user. Keyed waits are looked up directly instead of
+            having their ``check`` run for every event, so prefer them when many are pending.
 
         Raises
         -------
@@ -211,57 +297,162 @@ class Client:
             check = _check
 
         ev = event.lower()
-        try:
-            listeners = self._listeners[ev]
-        except KeyError:
-            listeners = []
-            self._listeners[ev] = listeners
-
-        listeners.append((future, check))
+        if key is None:
+            listeners = self._listeners.setdefault(ev, [])
+        else:
+            listeners = self._keyed_listeners.setdefault(ev, {}).setdefault(tuple(key), [])
+
+        entry = (future, check)
+        listeners.append(entry)
+        self._add_consumer('on_' + ev)
+        # Dropped as soon as it is resolved, times out or is cancelled, not on the next event
+        future.add_done_callback(functools.partial(self._remove_waiter, ev, key and tuple(key), entry))
+        # The awaited event comes in a later update, so the worker must not wait for this handler
+        current = asyncio.current_task(self.loop)
+        if current is not None:
+            self.pipeline.release(current)
         return asyncio.wait_for(future, timeout)
 
-    async def general_request(self, url, post=False, **params):
+    def _remove_waiter(self, event, key, entry, _):
+        if key is None:
+            listeners = self._listeners.get(event)
+        else:
+            keyed = self._keyed_listeners.get(event)
+            listeners = keyed.get(key) if keyed is not None else None
+        if listeners is None:
+            return
+        listeners.remove(entry)
+        self._remove_consumer('on_' + event)
+        if listeners:
+            return
+        if key is None:
+            del self._listeners[event]
+        else:
+            del keyed[key]
+            if not keyed:
+                del self._keyed_listeners[event]
+
+    def get_retry_policy(self, method):
+        """Returns the :class:`.RetryPolicy` used for TG API ``method``."""
+        return self.retry_policies.get(method, self.retry_policy)
+
+    async def _send_request(self, url, post, params, request_timeout=None):
+        options = {'timeout': request_timeout} if request_timeout is not None else {}
+        if post:
+            req = self.session.post(url, data=params, **options)
+        else:
+            req = self.session.get(url, params=params, **options)
+        async with req as r:
+            if r.content_type == 'application/json':
+                return await r.json()
+            return await r.text()
+
+    async def general_request(self, url, post=False, request_timeout=None, idempotent=None, policy=None, **params):
         params = convert_params(params)
-        for tries in range(5):
+        policy = policy or self.retry_policy
+        if idempotent is None:
+            idempotent = not post
+        deadline = time.monotonic() + policy.deadline if policy.deadline is not None else None
+        attempt = 0
+        while True:
             try:
-                req = self.session.post(url, data=params) if post else self.session.get(url, params=params)
-                async with req as r:
-                    if r.content_type == 'application/json':
-                        return await r.json()
-                    return await r.text()
-            except Exception as e:
-                print('Got exception in request: {}\nRetrying in {} seconds'.format(e, tries * 2 + 1), file=sys.stderr)
-                await asyncio.sleep(tries * 2 + 1)
-
-    async def _tg_request(self, method, post, calln=1, **kwargs):
-        if calln > 10:
-            raise TGApiError('TG API call failed after 10 retries')
+                return await self._send_request(url, post, params, request_timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not idempotent and not is_connect_error(e):
+                    raise AmbiguousRequestError(url.rsplit('/', 1)[-1], e) from e
+                attempt += 1
+                delay = policy.backoff(attempt)
+                if attempt >= policy.max_attempts or (deadline is not None and time.monotonic() + delay > deadline):
+                    raise TGApiError('Request failed after {} attempts: {}'.format(attempt, e)) from e
+                print('Got exception in request: {}\nRetrying in {:.2f} seconds'.format(e, delay), file=sys.stderr)
+                await asyncio.sleep(delay)
+
+    async def _tg_request(self, method, post, policy=None, idempotent=None, **kwargs):
         for param in kwargs:
             if isinstance(kwargs[param], (list, tuple)):
                 kwargs[param] = ','.join(map(str, kwargs[param]))
-            elif isinstance(kwargs[param], dict):
+            elif isinstance(kwargs[param], (dict, DataView)):
                 kwargs[param] = to_json(kwargs[param])
-        res = await self.general_request('https://api.telegram.org/bot{}/{}'.format(kwargs['access_token'], method),
-                                         post=post,
-                                         **kwargs)
-        if isinstance(res, str):
-            await asyncio.sleep(0.1)
-            return await self._tg_request(method, post, calln + 1, **kwargs)
-        error = res.get('error', None)
-        if error and error.get('error_code', None) == 6:
-            await asyncio.sleep(1)
-            return await self._tg_request(method, post, calln + 1, **kwargs)
-        elif error and error.get('error_code', None) == 10 and 'could not check access_token now' in error.get(
-                'error_msg', ''):
-            await asyncio.sleep(0.1)
-            return await self._tg_request(method, post, calln + 1, **kwargs)
-        return res
+        url = 'https://api.telegram.org/bot{}/{}'.format(kwargs['access_token'], method)
+        params = convert_params(kwargs)
+        policy = policy or self.get_retry_policy(method)
+        if idempotent is None:
+            idempotent = is_idempotent(method)
+        breaker = self.circuit_breaker
+        deadline = time.monotonic() + policy.deadline if policy.deadline is not None else None
+        attempt = 0
+        while True:
+            if breaker is not None and not breaker.allow():
+                raise CircuitBreakerOpen('TG API keeps failing, {} was not called'.format(method))
+            if self.send_scheduler is not None:
+                await self.send_scheduler.acquire(method, params.get('chat_id'))
+            res = error = None
+            try:
+                res = await self._send_request(url, post, params)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            attempt += 1
+            if error is not None or isinstance(res, str) or (res.get('error_code') or 0) >= 500:
+                # Network failure, server error or a non-JSON answer from something in front of the API
+                if not idempotent and (error is None or not is_connect_error(error)):
+                    # The request reached something that may have passed it on, only a failed connect is safe to repeat
+                    if error is None:
+                        if isinstance(res, str):
+                            error = TGApiError('Non-JSON response: {}'.format(res[:200]))
+                        else:
+                            error = TGApiError('[{}] {}'.format(res.get('error_code'), res.get('description')))
+                    raise AmbiguousRequestError(method, error) from error
+                # Calls that failed ambiguously are left out, the API may well have handled them
+                if breaker is not None:
+                    breaker.record_failure()
+                delay = policy.backoff(attempt)
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                parameters = res.get('parameters') or {}
+                if res.get('ok') is not False:
+                    return res
+                elif 'retry_after' in parameters:
+                    delay = parameters['retry_after']
+                elif 'migrate_to_chat_id' in parameters and 'chat_id' in params:
+                    params['chat_id'] = parameters['migrate_to_chat_id']
+                    delay = 0
+                else:
+                    return res
+            if attempt >= policy.max_attempts or (deadline is not None and time.monotonic() + delay > deadline):
+                if error is not None:
+                    raise TGApiError('TG API call {} failed after {} attempts: {}'.format(method, attempt, error)) \
+                        from error
+                if isinstance(res, str):
+                    raise TGApiError('TG API call {} failed after {} attempts'.format(method, attempt))
+                return res
+            await asyncio.sleep(delay)
+
+    async def tg_request(self, method, post=True, *, policy=None, idempotent=None, **kwargs):
+        """|coro|
+
+        Calls TG API ``method`` with ``kwargs`` as its parameters.
 
-    async def tg_request(self, method, post=True, **kwargs):
-        return await self._tg_request(method, post, **self.Payload(**kwargs))
+        Failed calls are retried according to :meth:`get_retry_policy`. A call that failed
+        after it was sent is only retried if the method is idempotent, otherwise
+        :exc:`.AmbiguousRequestError` is raised so the caller can decide.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            TG API method name.
+        post: :class:`bool`
+            Whether to send the parameters as a POST form. Defaults to ``True``.
+        policy: Optional[:class:`.RetryPolicy`]
+            Retry policy for this call only.
+        idempotent: Optional[:class:`bool`]
+            Overrides whether this call is safe to repeat after it was sent.
+            By default it is looked up in :data:`.retry.NON_IDEMPOTENT_METHODS`.
+        """
+        return await self._tg_request(method, post, policy, idempotent, **self.Payload(**kwargs))
 
-    async def user_tg_request(self, method, post=True, **kwargs):
-        return await self._tg_request(method, post, **self.UserPayload(**kwargs))
+    async def user_tg_request(self, method, post=True, *, policy=None, idempotent=None, **kwargs):
+        return await self._tg_request(method, post, policy, idempotent, **self.UserPayload(**kwargs))
 
     async def get_me(self):
         user = await self.tg_request('getMe')
@@ -285,7 +476,7 @@ class Client:
         return get_chat_member(response)
 
     def build_msg(self, msg):
-        res = Message(msg)
+        res = LazyMessage(msg) if self.lazy_messages else Message(msg)
         res.bot = self
         return res
 
@@ -293,134 +484,123 @@ class Client:
         return f'https://api.telegram.org/bot{self.token}/{method}'
 
     async def longpoll(self):
-        if self.offset is None:
-            self.offset = 0
-        payload = {'offset': self.offset}
+        # Updates still being handled stay unconfirmed, so Telegram sends them again after a crash
+        payload = {'offset': self.offset,
+                   'timeout': self.longpoll_timeout,
+                   'limit': self.longpoll_limit}
+        if self.allowed_updates is not None:
+            payload['allowed_updates'] = to_json(list(self.allowed_updates))
+        # Telegram holds the connection for up to ``timeout`` seconds, so the read budget must outlast it
+        request_timeout = aiohttp.ClientTimeout(total=self.longpoll_timeout + 10, connect=10)
         try:
-            res = await self.general_request(self.generate_link("getUpdates"), **payload)
-        except asyncio.TimeoutError:
-            return self.offset, []
+            # Not retried here, the polling loop backs off on errors itself
+            res = await self.general_request(self.generate_link("getUpdates"), request_timeout=request_timeout,
+                                             policy=_LONGPOLL_POLICY, **payload)
+        except TGApiError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                # The held connection went quiet for too long, which is no reason to back off
+                return []
+            raise
         if res['ok'] is False:
-            self.offset = 0
-        elif len(res['result']) != 0:
-            self.offset = res['result'][len(res['result']) - 1]['update_id']+1
-        updates = res['result']
-        return self.offset, updates
+            # E.g. 409 Conflict while a webhook is set or another poller runs, polling again at once would spin
+            raise TGApiError('[{}] {}'.format(res.get('error_code'), res.get('description')))
+        return res['result']
+
+    async def _skip_backlog(self):
+        res = await self.general_request(self.generate_link("getUpdates"), offset=-1, limit=1, timeout=0)
+        if res.get('ok') and res['result']:
+            self.offset = self._fetched = res['result'][-1]['update_id'] + 1
+            self._commit_offset()
+
+    def _update_done(self, update_id):
+        try:
+            del self._inflight[update_id]
+        except KeyError:
+            return
+        committed = next(iter(self._inflight), self._fetched)
+        if committed != self.offset:
+            self.offset = committed
+            self._progress.set()
+            if not self._commit_scheduled:
+                # Saved once per loop iteration however many updates finish in it
+                self._commit_scheduled = True
+                self.loop.call_soon(self._commit_offset)
+
+    def _commit_offset(self):
+        self._commit_scheduled = False
+        try:
+            self.offset_store.save(self.offset)
+        except Exception as e:
+            print('Ignoring exception while saving offset:\n{}'.format(e), file=sys.stderr)
 
     def handle_message(self, message):
+        return self._route_message('message_new', message)
+
+    def _route_message(self, event, message):
+        for key, action in _MESSAGE_EVENTS:
+            if key in message:
+                event = action
+                break
+        else:
+            if 'text' not in message:
+                event = 'something_without_text'
+        if not self.has_consumers(event):
+            return
         msg = self.build_msg(message)
         if not self.check_date(msg):
             return
-        action = None
-        if msg.sticker is not None:
-            action = "sticker_new"
-        elif msg.audio is not None:
-            action = "audio_new"
-        elif msg.video is not None:
-            action = "video_new"
-        elif msg.video_note is not None:
-            action = "video_note_new"
-        elif msg.voice is not None:
-            action = "voice_new"
-        elif msg.poll is not None:
-            action = "poll_new"
-        elif msg.left_chat_member is not None:
-            action = "chat_member_left"
-        elif msg.photo is not None:
-            action = "photo_new"
-        elif msg.new_chat_members is not None:
-            action = 'new_chat_members'
-        elif msg.successful_payment is not None:
-            action = "successful_payment"
-        if action is not None:
-            return self.dispatch(action, msg)
-        if msg.text is None:
-            return self.dispatch("something_without_text",msg)
-        return self.dispatch('message_new', msg)
+        return self.dispatch(event, msg)
+
+    def build_callback_query(self, obj):
+        res = CallbackQuery(obj)
+        res.bot = self
+        return res
 
     def handle_callback_query(self, t, obj):
-        event = CallbackQuery(obj)
-        event.bot = self
-        return self.dispatch(t, event)
-
-    def handle_sticker_new(self, t, obj):
-        msg = self.build_msg(obj)
-        return self.dispatch(t, msg)
-
-    def handle_message_reply(self, t, obj):
-        msg = self.build_msg(obj)
-        return self.dispatch(t, msg)
-
-    def handle_message_edit(self, t, obj):
-        msg = self.build_msg(obj)
-        return self.dispatch(t, msg)
-
-    def handle_custom_classes(self, t, obj, update):
-        names = t.split("_")
-        name = [r.title() for r in names]
-        class_name = ''.join(name)
-        if class_name not in globals():
-            return self.dispatch('unknown', update)
-        klass = globals()[class_name]
-        instance = klass(obj)
-        return self.dispatch(t, instance)
+        return self.dispatch(t, self.build_callback_query(obj))
 
     def check_date(self, message):
-        date = datetime.datetime.now() - datetime.timedelta(seconds=5)
-        return message.date > date
+        if self._backlog_cutoff is None:
+            return True
+        return message.date > self._backlog_cutoff
 
     def handle_update(self, update):
         try:
             update.pop('update_id')
         except Exception:
             return
-        t = list(update.keys())[0]
-        obj = update[t]
-        on_t = 'on_{}'.format(t)
-        used = (t in self._listeners and self._listeners[t]) or (on_t in self.extra_events and self.extra_events[on_t])
-        unknown_used = ('unknown' in self._listeners and self._listeners['unknown']) or (
-                'on_unknown' in self.extra_events and self.extra_events['on_unknown'])
-        if t == 'message':
-            return self.handle_message(obj)
-        elif t in ['inline_query', 'chosen_inline_result', 'callback_query', 'shipping_query', 'pre_checkout_query',
-                   'poll',
-                   'poll_answer', 'my_chat_member', 'chat_member', 'chat_join_request']:
-            return self.handle_custom_classes(t, obj, update)
-        elif t in self.event_handlers and used:
-            return self.loop.create_task(maybe_coroutine(self.event_handlers[t], t, obj))
-        elif t not in self.event_handlers and unknown_used:
-            return self.dispatch('unknown', update)
+        for t, obj in update.items():
+            break
+        else:
+            return
+        route = self.update_types.get(t)
+        if route is None:
+            if self.has_consumers('unknown'):
+                self.dispatch('unknown', update)
+            return
+        parser, handler, event = route
+        if handler is None and not self.has_consumers(event):
+            return
+        if parser is not None:
+            obj = parser(obj)
+        if handler is not None:
+            return handler(event, obj)
+        return self.dispatch(event, obj)
 
     def dispatch(self, event, *args, **kwargs):
         method = 'on_' + event
         listeners = self._listeners.get(event)
         if listeners:
-            removed = []
-            for i, (future, condition) in enumerate(listeners):
-                if future.cancelled():
-                    removed.append(i)
-                    continue
-
-                try:
-                    result = condition(*args)
-                except Exception as exc:
-                    future.set_exception(exc)
-                    removed.append(i)
-                else:
-                    if result:
-                        if len(args) == 0:
-                            future.set_result(None)
-                        elif len(args) == 1:
-                            future.set_result(args[0])
-                        else:
-                            future.set_result(args)
-                        removed.append(i)
-
-            if len(removed) == len(listeners):
-                self._listeners.pop(event)
-            else:
-                for idx in reversed(removed):
-                    del listeners[idx]
+            self._resolve_waiters(listeners, args)
+        keyed = self._keyed_listeners.get(event)
+        if keyed and args:
+            key = _listener_key(args[0])
+            if key is not None:
+                chat_id, user_id = key
+                for k in (key, (chat_id, None), (None, user_id)):
+                    waiters = keyed.get(k)
+                    if waiters:
+                        self._resolve_waiters(waiters, args)
 
         try:
             coro = getattr(self, method)
@@ -429,6 +609,26 @@ class Client:
         else:
             self._schedule_event(coro, method, *args, **kwargs)
 
+    @staticmethod
+    def _resolve_waiters(waiters, args):
+        # Resolved waiters are removed by their done callback, which runs after this returns
+        for future, condition in waiters:
+            if future.done():
+                continue
+
+            try:
+                result = condition(*args)
+            except Exception as exc:
+                future.set_exception(exc)
+            else:
+                if result:
+                    if len(args) == 0:
+                        future.set_result(None)
+                    elif len(args) == 1:
+                        future.set_result(args[0])
+                    else:
+                        future.set_result(args)
+
     async def on_error(self, event_method, *args, **kwargs):
         print('Ignoring exception in {}'.format(event_method), file=sys.stderr)
         traceback.print_exc()
@@ -490,7 +690,19 @@ class Client:
 
     def _schedule_event(self, coro, event_name, *args, **kwargs):
         wrapped = self._run_event(coro, event_name, *args, **kwargs)
-        return _ClientEventTask(original_coro=coro, event_name=event_name, coro=wrapped, loop=self.loop)
+        task = _ClientEventTask(original_coro=coro, event_name=event_name, coro=wrapped, loop=self.loop)
+        if self._collected is not None:
+            self._collected.append(task)
+        return task
+
+    def _collect_events(self, update):
+        # handle_update is synchronous, so every task scheduled until it returns belongs to this update
+        self._collected = tasks = []
+        try:
+            self.handle_update(update)
+        finally:
+            self._collected = None
+        return tasks
 
     async def edit_message_text(self,chat_id,text,message_id=None,inline_message_id=None,entities=None,parse_mode	=None,disable_web_page_preview=None,reply_markup=None):
         params = {'chat_id': chat_id,
@@ -557,15 +769,6 @@ class Client:
         # if not as_user else await self.user_vk_request(
         # 'messages.send', **params)
         if res.get('ok') != True:
-            if res.get('error_code') == 9:
-                await asyncio.sleep(1)
-                return await self.send_message(chat_id, text, message_thread_id=message_thread_id,
-                                               parse_mode=parse_mode,
-                                               entities=entities, disable_web_page_preview=disable_web_page_preview,
-                                               disable_notification=disable_notification,
-                                               protect_content=protect_content, reply_to_message_id=reply_to_message_id,
-                                               allow_sending_without_reply=allow_sending_without_reply,
-                                               reply_markup=reply_markup, **kwargs)
             raise TGApiError('[{error_code}] {description}'.format(**res))
         if self.is_group and not as_user:
             params['from'] = self.group.dict
@@ -582,19 +785,48 @@ class Client:
 
     async def _run(self):
         self.is_group = True
+        if self.identity_map is not None:
+            # Everything this client runs is spawned from here, so it all shares the map
+            self.identity_map.activate()
         self.group = await self.get_me()
+        if self.offset_store is None:
+            self.offset_store = FileOffsetStore('.tg_botting_{}.offset'.format(self.group.id))
+        self.offset = self._fetched = self.offset_store.load() or 0
+        if self.backlog == 'skip':
+            await self._skip_backlog()
+        elif self.backlog == 'replay':
+            self._backlog_cutoff = datetime.datetime.now() - datetime.timedelta(seconds=self.backlog_window)
+        self.pipeline.start()
         self.dispatch('ready')
-        updates = []
+        failures = 0
         while True:
             try:
-                lp = self.loop.create_task(self.longpoll())
-                for update in updates:
-                    self.handle_update(update)
-                self.offset, updates = await lp
+                self._progress.clear()
+                updates = await self.longpoll()
+                failures = 0
+                # Updates still being handled are not confirmed yet, so Telegram sends them again
+                fresh = [update for update in updates if update['update_id'] >= self._fetched]
+                if updates and not fresh:
+                    # Telegram answers at once while they are pending, so instead of spinning this polls
+                    # again when one of them finished or after a pause, which still picks up new updates
+                    try:
+                        await asyncio.wait_for(self._progress.wait(), self.inflight_poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                for update in fresh:
+                    self._fetched = update['update_id'] + 1
+                    self._inflight[update['update_id']] = None
+                    # Waits while the pipeline is full, so polling pauses until the workers catch up
+                    await self.pipeline.put(update)
+                if not self._inflight and self.offset != self._fetched:
+                    self.offset = self._fetched
+                    self._commit_offset()
             except Exception as e:
                 traceback.print_exc(file=sys.stderr)
                 print('Ignoring exception in longpoll cycle:\n{}'.format(e), file=sys.stderr)
-                self.offset+=1
+                failures += 1
+                await asyncio.sleep(self.retry_policy.backoff(failures))
 
     def run(self, token, user_id=None, user_hash=None):
         self.use_stack_trace = False
@@ -604,6 +836,83 @@ class Client:
         self.loop.create_task(self._run())
         self.loop.run_forever()
 
+    async def set_webhook(self, url, secret_token=None, max_connections=None, drop_pending_updates=None):
+        params = {'url': url,
+                  'secret_token': secret_token,
+                  'max_connections': max_connections,
+                  'drop_pending_updates': drop_pending_updates,
+                  'allowed_updates': to_json(list(self.allowed_updates)) if self.allowed_updates is not None else None,
+                  }
+        res = await self.tg_request('setWebhook', **params)
+        if res.get('ok') != True:
+            raise TGApiError('[{error_code}] {description}'.format(**res))
+        return res
+
+    async def delete_webhook(self, drop_pending_updates=None):
+        res = await self.tg_request('deleteWebhook', drop_pending_updates=drop_pending_updates)
+        if res.get('ok') != True:
+            raise TGApiError('[{error_code}] {description}'.format(**res))
+        return res
+
+    async def _handle_webhook(self, request):
+        if self.webhook_secret is not None:
+            received = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+            if not hmac.compare_digest(received, self.webhook_secret):
+                return web.Response(status=403)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(update, dict):
+            return web.Response(status=400)
+        # Telegram only needs the acknowledgement, handlers run after the response is sent.
+        # A full pipeline holds the response back, which makes Telegram slow down delivery
+        await self.pipeline.put(update)
+        return web.Response()
+
+    async def _run_webhook(self, host, port, path, url):
+        self.is_group = True
+        if self.identity_map is not None:
+            # Everything this client runs is spawned from here, so it all shares the map
+            self.identity_map.activate()
+        self.group = await self.get_me()
+        self.pipeline.start()
+        if url is not None:
+            await self.set_webhook(url, secret_token=self.webhook_secret)
+        app = web.Application()
+        app.router.add_post(path, self._handle_webhook)
+        self.webhook_runner = web.AppRunner(app)
+        await self.webhook_runner.setup()
+        site = web.TCPSite(self.webhook_runner, host, port)
+        await site.start()
+        self.dispatch('ready')
+
+    def run_webhook(self, token, host='0.0.0.0', port=8080, path='/', url=None, secret_token=None):
+        """A blocking call that receives updates through a webhook instead of the getUpdates loop.
+
+        Parameters
+        ----------
+        token: :class:`str`
+            Bot token.
+        host: :class:`str`
+            Interface the webhook server binds to.
+        port: :class:`int`
+            Port the webhook server listens on.
+        path: :class:`str`
+            Route Telegram posts updates to.
+        url: Optional[:class:`str`]
+            Public webhook url. If passed, it is registered with ``setWebhook`` on startup,
+            otherwise the webhook is expected to be set already (e.g. by another replica).
+        secret_token: Optional[:class:`str`]
+            Value expected in the ``X-Telegram-Bot-Api-Secret-Token`` header. Requests
+            without it are rejected.
+        """
+        self.use_stack_trace = False
+        self.token = token
+        self.webhook_secret = secret_token
+        self.loop.create_task(self._run_webhook(host, port, path, url))
+        self.loop.run_forever()
+
 # class UserClient(Client):
 #
 #     def __init__(self, **kwargs):
@@ -2,16 +2,19 @@ import asyncio
 import datetime
 import functools
 import inspect
+import itertools
 import sys
+import time
 import typing
 
 import tg_botting.conversions as converters
 from tg_botting._types import _BaseCommand
 from tg_botting.cog import Cog
-from tg_botting.cooldowns import CooldownMapping, BucketType, Cooldown
+from tg_botting.cooldowns import CooldownMapping, BucketType, Cooldown, MaxConcurrency
 from tg_botting.exceptions import CommandError, CommandInvokeError, ClientException, ConversionError, BadArgument, \
-    BadUnionArgument, MissingRequiredArgument, TooManyArguments, DisabledCommand, CheckFailure, CommandOnCooldown
-from tg_botting.utils import maybe_coroutine, async_all
+    BadUnionArgument, MissingRequiredArgument, TooManyArguments, DisabledCommand, CheckFailure, CommandOnCooldown, \
+    CommandTimeout
+from tg_botting.utils import run_checks
 
 
 def wrap_callback(coro):
@@ -66,6 +69,7 @@ class GroupMixin:
     def __init__(self, *args, **kwargs):
         case_insensitive = kwargs.pop('case_insensitive', False)
         self.all_commands = _CaseInsensitiveDict() if case_insensitive else {}
+        self._command_trie = _CommandTrie(case_insensitive)
         self.case_insensitive = case_insensitive
         super().__init__(*args, **kwargs)
 
@@ -110,10 +114,12 @@ class GroupMixin:
             raise ClientException('Command {0.name} is already registered.'.format(command))
 
         self.all_commands[command.name] = command
+        self._command_trie.insert(command.name)
         for alias in command.aliases:
             if alias in self.all_commands:
                 raise ClientException('The alias {} is already an existing command or alias.'.format(alias))
             self.all_commands[alias] = command
+            self._command_trie.insert(alias)
 
     def remove_command(self, name):
         """Remove a :class:`.Command` or subclasses from the internal list
@@ -137,11 +143,13 @@ class GroupMixin:
         if command is None:
             return None
 
+        self._command_trie.remove(name)
         if name in command.aliases:
             return command
 
         for alias in command.aliases:
-            self.all_commands.pop(alias, None)
+            if self.all_commands.pop(alias, None) is not None:
+                self._command_trie.remove(alias)
         return command
 
     def walk_commands(self):
@@ -237,6 +245,187 @@ def command(name=None, cls=None, **attrs):
     return decorator
 
 
+def _cooldown_namespace(func):
+    # Stable across processes, so a shared cooldown store keeps the buckets of a command together
+    return '{0.__module__}.{0.__qualname__}'.format(func)
+
+
+_POSITIONAL_OR_KEYWORD = inspect.Parameter.POSITIONAL_OR_KEYWORD
+_VAR_POSITIONAL = inspect.Parameter.VAR_POSITIONAL
+_KEYWORD_ONLY = inspect.Parameter.KEYWORD_ONLY
+
+
+def _resolve_converter(converter):
+    # Returns the function doing the conversion and whether it is a coroutine taking the context
+    if converter is bool:
+        return converters._convert_to_bool, False
+
+    module = getattr(converter, '__module__', None)
+    if module is not None and (module.startswith('tg_botting.') and not module.endswith('converter')):
+        converter = getattr(converters, getattr(converter, '__name__', '') + 'Converter', converter)
+
+    if inspect.isclass(converter):
+        if issubclass(converter, converters.Converter):
+            # A new instance per conversion, as converters may keep state on ``self``
+            # and the same command can run concurrently
+            cls = converter
+
+            def convert(ctx, argument):
+                return cls().convert(ctx, argument)
+            return convert, True
+        method = getattr(converter, 'convert', None)
+        if method is not None and inspect.ismethod(method):
+            return method, True
+    elif isinstance(converter, converters.Converter):
+        return converter.convert, True
+    return converter, False
+
+
+class _Conversion:
+    """A single converter, resolved once instead of on every argument."""
+    __slots__ = ('converter', 'func', 'is_coroutine', 'name')
+
+    def __init__(self, converter):
+        self.converter = converter
+        self.func, self.is_coroutine = _resolve_converter(converter)
+        try:
+            self.name = converter.__name__
+        except AttributeError:
+            self.name = converter.__class__.__name__
+
+    async def convert(self, ctx, argument, param):
+        if self.is_coroutine:
+            try:
+                return await self.func(ctx, argument)
+            except CommandError:
+                raise
+            except Exception as exc:
+                raise ConversionError(self.converter, exc) from exc
+
+        try:
+            return self.func(argument)
+        except CommandError:
+            raise
+        except Exception as exc:
+            raise BadArgument('Converting to "{}" failed for parameter "{}".'.format(self.name, param.name)) from exc
+
+
+class _UnionConversion:
+    """Tries the converters of a :data:`typing.Union` in order."""
+    __slots__ = ('converter', 'conversions')
+
+    def __init__(self, converter):
+        self.converter = converter
+        self.conversions = [(conv is type(None), _Conversion(conv)) for conv in converter.__args__]
+
+    async def convert(self, ctx, argument, param):
+        errors = []
+        for is_none, conversion in self.conversions:
+            if is_none and param.kind != param.VAR_POSITIONAL:
+                ctx.view.undo()
+                return None if param.default is param.empty else param.default
+
+            try:
+                value = await conversion.convert(ctx, argument, param)
+            except CommandError as exc:
+                errors.append(exc)
+            else:
+                return value
+
+        raise BadUnionArgument(param, self.converter.__args__, errors)
+
+
+def _compile_conversion(converter):
+    if getattr(converter, '__origin__', None) is typing.Union:
+        return _UnionConversion(converter)
+    return _Conversion(converter)
+
+
+class _ParamPlan:
+    """How one parameter of a command callback is read, worked out when the callback is set."""
+    __slots__ = ('name', 'param', 'kind', 'required', 'default', 'optional', 'greedy', 'conversion')
+
+    def __init__(self, param, optional):
+        self.name = param.name
+        self.param = param
+        self.kind = param.kind
+        self.required = param.default is param.empty
+        self.default = param.default
+        self.optional = optional
+        self.greedy = None
+
+        converter = param.annotation
+        if converter is param.empty:
+            if param.default is not param.empty:
+                converter = str if param.default is None else type(param.default)
+            else:
+                converter = str
+
+        if type(converter) is converters._Greedy:
+            if param.kind in (_POSITIONAL_OR_KEYWORD, _VAR_POSITIONAL):
+                self.greedy = param.kind
+            converter = converter.converter
+        self.conversion = _compile_conversion(converter)
+
+
+class _CommandTrie:
+    """Word-level index of command names and aliases, so the longest name
+    a message starts with is found in a single pass over its words."""
+    __slots__ = ('root', 'case_insensitive')
+
+    def __init__(self, case_insensitive=False):
+        self.root = {}
+        self.case_insensitive = case_insensitive
+
+    def insert(self, name):
+        if self.case_insensitive:
+            name = name.lower()
+        node = self.root
+        for word in name.split(' '):
+            node = node.setdefault(word, {})
+        # None never collides with a word, so it marks the nodes where a name ends
+        node[None] = name
+
+    def remove(self, name):
+        if self.case_insensitive:
+            name = name.lower()
+        node = self.root
+        path = []
+        for word in name.split(' '):
+            child = node.get(word)
+            if child is None:
+                return
+            path.append((node, word))
+            node = child
+        node.pop(None, None)
+        for parent, word in reversed(path):
+            if parent[word]:
+                break
+            del parent[word]
+
+    def longest_prefix(self, text, start=0):
+        """Returns the length of the longest name ``text[start:]`` starts with, followed by
+        a space or the end of ``text``, or 0 if there is none."""
+        node = self.root
+        found = offset = start
+        end = len(text)
+        while True:
+            stop = text.find(' ', start)
+            if stop == -1:
+                stop = end
+            word = text[start:stop]
+            if self.case_insensitive:
+                word = word.lower()
+            node = node.get(word)
+            if node is None:
+                return found - offset
+            if None in node:
+                found = stop
+            if stop == end:
+                return found - offset
+            start = stop + 1
+
+
 class _CaseInsensitiveDict(dict):
     def __contains__(self, k):
         return super().__contains__(k.lower())
@@ -306,6 +495,11 @@ class Command(_BaseCommand):
         If ``True``\, cooldown processing is done after argument parsing,
         which calls converters. If ``False`` then cooldown processing is done
         first and then the converters are called second. Defaults to ``False``.
+    timeout: Optional[:class:`float`]
+        Seconds the callback may run before it is cancelled, its after invoke
+        hooks are called and :exc:`.CommandTimeout` is raised to the error
+        handlers. Defaults to the ``command_timeout`` of the bot, which is
+        ``None``, i.e. no limit.
     """
 
     def __new__(cls, *args, **kwargs):
@@ -335,9 +529,16 @@ class Command(_BaseCommand):
         except AttributeError:
             cooldown = kwargs.pop('cooldown', None)
         finally:
-            self._buckets = CooldownMapping(cooldown)
+            self._buckets = CooldownMapping(cooldown, _cooldown_namespace(func))
+
+        try:
+            max_concurrency = func.__commands_max_concurrency__
+        except AttributeError:
+            max_concurrency = kwargs.pop('max_concurrency', None)
+        self._max_concurrency = max_concurrency.copy() if max_concurrency is not None else None
 
         self.cooldown_after_parsing = kwargs.pop('cooldown_after_parsing', False)
+        self.timeout = kwargs.pop('timeout', None)
         self.cog = None
 
         parent = kwargs.pop('parent', None)
@@ -401,6 +602,9 @@ class Command(_BaseCommand):
             if isinstance(value.annotation, str):
                 self.params[key] = value = value.replace(annotation=eval(value.annotation, function.__globals__))
 
+        self._param_plans = [_ParamPlan(param, self._is_typing_optional(param.annotation))
+                             for param in self.params.values()]
+
     def update(self, **kwargs):
         """Updates :class:`Command` instance with updated attribute.
 
@@ -457,117 +661,38 @@ class Command(_BaseCommand):
         finally:
             ctx.bot.dispatch('command_error', ctx, error)
 
-    async def _actual_conversion(self, ctx, converter, argument, param):
-        if converter is bool:
-            return converters._convert_to_bool(argument)
-
-        try:
-            module = converter.__module__
-        except AttributeError:
-            pass
-        else:
-            if module is not None and (module.startswith('vk_botting.') and not module.endswith('converter')):
-                converter = getattr(converters, converter.__name__ + 'Converter')
-
-        try:
-            if inspect.isclass(converter):
-                if issubclass(converter, converters.Converter):
-                    instance = converter()
-                    ret = await instance.convert(ctx, argument)
-                    return ret
-                else:
-                    method = getattr(converter, 'convert', None)
-                    if method is not None and inspect.ismethod(method):
-                        ret = await method(ctx, argument)
-                        return ret
-            elif isinstance(converter, converters.Converter):
-                ret = await converter.convert(ctx, argument)
-                return ret
-        except CommandError:
-            raise
-        except Exception as exc:
-            raise ConversionError(converter, exc) from exc
-
-        try:
-            return converter(argument)
-        except CommandError:
-            raise
-        except Exception as exc:
-            try:
-                name = converter.__name__
-            except AttributeError:
-                name = converter.__class__.__name__
-
-            raise BadArgument('Converting to "{}" failed for parameter "{}".'.format(name, param.name)) from exc
-
     async def do_conversion(self, ctx, converter, argument, param):
-        try:
-            origin = converter.__origin__
-        except AttributeError:
-            pass
-        else:
-            if origin is typing.Union:
-                errors = []
-                _NoneType = type(None)
-                for conv in converter.__args__:
-                    if conv is _NoneType and param.kind != param.VAR_POSITIONAL:
-                        ctx.view.undo()
-                        return None if param.default is param.empty else param.default
-
-                    try:
-                        value = await self._actual_conversion(ctx, conv, argument, param)
-                    except CommandError as exc:
-                        errors.append(exc)
-                    else:
-                        return value
+        return await _compile_conversion(converter).convert(ctx, argument, param)
 
-                raise BadUnionArgument(param, converter.__args__, errors)
-
-        return await self._actual_conversion(ctx, converter, argument, param)
-
-    def _get_converter(self, param):
-        converter = param.annotation
-        if converter is param.empty:
-            if param.default is not param.empty:
-                converter = str if param.default is None else type(param.default)
-            else:
-                converter = str
-        return converter
-
-    async def transform(self, ctx, param):
-        required = param.default is param.empty
-        converter = self._get_converter(param)
-        consume_rest_is_special = param.kind == param.KEYWORD_ONLY and not self.rest_is_raw
+    async def transform(self, ctx, plan):
         view = ctx.view
         view.skip_ws()
 
-        if type(converter) is converters._Greedy:
-            if param.kind == param.POSITIONAL_OR_KEYWORD:
-                return await self._transform_greedy_pos(ctx, param, required, converter.converter)
-            elif param.kind == param.VAR_POSITIONAL:
-                return await self._transform_greedy_var_pos(ctx, param, converter.converter)
-            else:
-                converter = converter.converter
+        greedy = plan.greedy
+        if greedy is not None:
+            if greedy == _POSITIONAL_OR_KEYWORD:
+                return await self._transform_greedy_pos(ctx, plan)
+            return await self._transform_greedy_var_pos(ctx, plan)
 
         if view.eof:
-            if param.kind == param.VAR_POSITIONAL:
+            if plan.kind == _VAR_POSITIONAL:
                 raise RuntimeError()  # break the loop
-            if required:
-                if self._is_typing_optional(param.annotation):
+            if plan.required:
+                if plan.optional:
                     return None
-                raise MissingRequiredArgument(param)
-            return param.default
+                raise MissingRequiredArgument(plan.param)
+            return plan.default
 
         previous = view.index
-        if consume_rest_is_special:
+        if plan.kind == _KEYWORD_ONLY and not self.rest_is_raw:
             argument = view.read_rest().strip()
         else:
             argument = view.get_quoted_word()
         view.previous = previous
 
-        return await self.do_conversion(ctx, converter, argument, param)
+        return await plan.conversion.convert(ctx, argument, plan.param)
 
-    async def _transform_greedy_pos(self, ctx, param, required, converter):
+    async def _transform_greedy_pos(self, ctx, plan):
         view = ctx.view
         result = []
         while not view.eof:
@@ -576,23 +701,23 @@ class Command(_BaseCommand):
             view.skip_ws()
             argument = view.get_quoted_word()
             try:
-                value = await self.do_conversion(ctx, converter, argument, param)
+                value = await plan.conversion.convert(ctx, argument, plan.param)
             except CommandError:
                 view.index = previous
                 break
             else:
                 result.append(value)
 
-        if not result and not required:
-            return param.default
+        if not result and not plan.required:
+            return plan.default
         return result
 
-    async def _transform_greedy_var_pos(self, ctx, param, converter):
+    async def _transform_greedy_var_pos(self, ctx, plan):
         view = ctx.view
         previous = view.index
         argument = view.get_quoted_word()
         try:
-            value = await self.do_conversion(ctx, converter, argument, param)
+            value = await plan.conversion.convert(ctx, argument, plan.param)
         except CommandError:
             view.index = previous
             raise RuntimeError() from None
@@ -683,37 +808,32 @@ class Command(_BaseCommand):
         kwargs = ctx.kwargs
 
         view = ctx.view
-        iterator = iter(self.params.items())
+        plans = self._param_plans
+        skip = len(args)
 
-        if self.cog is not None:
-            try:
-                next(iterator)
-            except StopIteration:
+        if len(plans) < skip:
+            if self.cog is not None and not plans:
                 fmt = 'Callback for {0.name} command is missing "self" parameter.'
-                raise ClientException(fmt.format(self))
-
-        try:
-            next(iterator)
-        except StopIteration:
-            fmt = 'Callback for {0.name} command is missing "ctx" parameter.'
+            else:
+                fmt = 'Callback for {0.name} command is missing "ctx" parameter.'
             raise ClientException(fmt.format(self))
 
-        for name, param in iterator:
-            if param.kind == param.POSITIONAL_OR_KEYWORD:
-                transformed = await self.transform(ctx, param)
+        for plan in itertools.islice(plans, skip, None):
+            kind = plan.kind
+            if kind == _POSITIONAL_OR_KEYWORD:
+                transformed = await self.transform(ctx, plan)
                 args.append(transformed)
-            elif param.kind == param.KEYWORD_ONLY:
+            elif kind == _KEYWORD_ONLY:
                 if self.rest_is_raw:
-                    converter = self._get_converter(param)
                     argument = view.read_rest()
-                    kwargs[name] = await self.do_conversion(ctx, converter, argument, param)
+                    kwargs[plan.name] = await plan.conversion.convert(ctx, argument, plan.param)
                 else:
-                    kwargs[name] = await self.transform(ctx, param)
+                    kwargs[plan.name] = await self.transform(ctx, plan)
                 break
-            elif param.kind == param.VAR_POSITIONAL:
+            elif kind == _VAR_POSITIONAL:
                 while not view.eof:
                     try:
-                        transformed = await self.transform(ctx, param)
+                        transformed = await self.transform(ctx, plan)
                         args.append(transformed)
                     except RuntimeError:
                         break
@@ -747,51 +867,95 @@ class Command(_BaseCommand):
             await hook(ctx)
 
     async def call_after_hooks(self, ctx):
-        cog = self.cog
-        if self._after_invoke is not None:
-            if cog is None:
-                await self._after_invoke(ctx)
-            else:
-                await self._after_invoke(cog, ctx)
+        try:
+            cog = self.cog
+            if self._after_invoke is not None:
+                if cog is None:
+                    await self._after_invoke(ctx)
+                else:
+                    await self._after_invoke(cog, ctx)
 
-        if cog is not None:
-            hook = Cog._get_overridden_method(cog.cog_after_invoke)
+            if cog is not None:
+                hook = Cog._get_overridden_method(cog.cog_after_invoke)
+                if hook is not None:
+                    await hook(ctx)
+
+            hook = ctx.bot._after_invoke
             if hook is not None:
                 await hook(ctx)
+        finally:
+            self._release_concurrency(ctx)
 
-        hook = ctx.bot._after_invoke
-        if hook is not None:
-            await hook(ctx)
+    def _release_concurrency(self, ctx):
+        # Only releases what this context acquired, so hooks called again on reinvoke release nothing
+        if ctx._concurrency is not None:
+            limiter, key = ctx._concurrency
+            ctx._concurrency = None
+            limiter.release(key)
 
-    def _prepare_cooldowns(self, ctx):
+    async def _prepare_cooldowns(self, ctx):
         if self._buckets.valid:
             current = ctx.message.date.replace(tzinfo=datetime.timezone.utc).timestamp()
-            bucket = self._buckets.get_bucket(ctx.message, current)
-            retry_after = bucket.update_rate_limit(current)
+            retry_after = await self._buckets.update_rate_limit(ctx.message, current, ctx.bot.cooldown_store)
             if retry_after:
-                raise CommandOnCooldown(bucket, retry_after)
+                if ctx.bot.metrics is not None:
+                    ctx.bot.metrics.inc('command_cooldowns_total', (('command', self.qualified_name),))
+                raise CommandOnCooldown(self._buckets.cooldown, retry_after)
+
+    def _observe(self, ctx, name, start):
+        metrics = ctx.bot.metrics
+        if metrics is not None:
+            metrics.observe(name, time.perf_counter() - start, (('command', self.qualified_name),))
+
+    async def _timed_parse_arguments(self, ctx):
+        start = time.perf_counter()
+        try:
+            await self._parse_arguments(ctx)
+        finally:
+            self._observe(ctx, 'command_parse_seconds', start)
 
     async def prepare(self, ctx):
         ctx.command = self
-        await self._verify_checks(ctx)
+        start = time.perf_counter()
+        try:
+            await self._verify_checks(ctx)
+        finally:
+            self._observe(ctx, 'command_check_seconds', start)
 
-        if self.cooldown_after_parsing:
-            await self._parse_arguments(ctx)
-            self._prepare_cooldowns(ctx)
-        else:
-            self._prepare_cooldowns(ctx)
-            await self._parse_arguments(ctx)
+        if self._max_concurrency is not None:
+            key = await self._max_concurrency.acquire(ctx.message)
+            ctx._concurrency = (self._max_concurrency, key)
 
-        await self.call_before_hooks(ctx)
+        try:
+            if self.cooldown_after_parsing:
+                await self._timed_parse_arguments(ctx)
+                await self._prepare_cooldowns(ctx)
+            else:
+                await self._prepare_cooldowns(ctx)
+                await self._timed_parse_arguments(ctx)
+
+            await self.call_before_hooks(ctx)
+        except BaseException:
+            # The after hooks that release it only run once the callback was called
+            self._release_concurrency(ctx)
+            raise
 
     def is_on_cooldown(self, ctx):
         """Checks whether the command is currently on cooldown.
 
+        This only works with cooldowns kept in memory, use :meth:`is_on_cooldown_async`
+        when the bot has another ``cooldown_store``.
+
         Parameters
         -----------
         ctx: :class:`.Context`
             The invocation context to use when checking the commands cooldown status.
 
+        Raises
+        -------
+        TypeError
+            The bot's ``cooldown_store`` can only be used asynchronously.
+
         Returns
         --------
         :class:`bool`
@@ -800,26 +964,77 @@ class Command(_BaseCommand):
         if not self._buckets.valid:
             return False
 
-        bucket = self._buckets.get_bucket(ctx.message)
+        bucket = self._buckets.get_bucket(ctx.message, store=ctx.bot.cooldown_store)
         return bucket.get_tokens() == 0
 
     def reset_cooldown(self, ctx):
         """Resets the cooldown on this command.
 
+        This only works with cooldowns kept in memory, use :meth:`reset_cooldown_async`
+        when the bot has another ``cooldown_store``.
+
         Parameters
         -----------
         ctx: :class:`.Context`
             The invocation context to reset the cooldown under.
+
+        Raises
+        -------
+        TypeError
+            The bot's ``cooldown_store`` can only be used asynchronously.
         """
         if self._buckets.valid:
-            bucket = self._buckets.get_bucket(ctx.message)
+            bucket = self._buckets.get_bucket(ctx.message, store=ctx.bot.cooldown_store)
             bucket.reset()
 
+    async def is_on_cooldown_async(self, ctx):
+        """|coro|
+
+        Like :meth:`is_on_cooldown`, but works with every ``cooldown_store``.
+        """
+        if not self._buckets.valid:
+            return False
+
+        return await self._buckets.get_tokens(ctx.message, store=ctx.bot.cooldown_store) == 0
+
+    async def reset_cooldown_async(self, ctx):
+        """|coro|
+
+        Like :meth:`reset_cooldown`, but works with every ``cooldown_store``.
+        """
+        if self._buckets.valid:
+            await self._buckets.reset(ctx.message, store=ctx.bot.cooldown_store)
+
     async def invoke(self, ctx):
-        await self.prepare(ctx)
-        ctx.invoked_subcommand = None
-        injected = hooked_wrapped_callback(self, ctx, self.callback)
-        await injected(*ctx.args, **ctx.kwargs)
+        start = time.perf_counter()
+        try:
+            await self.prepare(ctx)
+            ctx.invoked_subcommand = None
+            timeout = self.timeout if self.timeout is not None else ctx.bot.command_timeout
+            if timeout is None:
+                injected = hooked_wrapped_callback(self, ctx, self.callback)
+            else:
+                # Only the callback runs under the deadline, the after hooks and the concurrency release do not
+                injected = hooked_wrapped_callback(self, ctx, functools.partial(self._invoke_with_timeout, ctx, timeout))
+            callback_start = time.perf_counter()
+            try:
+                await injected(*ctx.args, **ctx.kwargs)
+            finally:
+                self._observe(ctx, 'command_callback_seconds', callback_start)
+        finally:
+            ctx.elapsed = time.perf_counter() - start
+
+    async def _invoke_with_timeout(self, ctx, timeout, *args, **kwargs):
+        task = ctx.bot.loop.create_task(self.callback(*args, **kwargs))
+        # wait_for inside the callback can still release the update pipeline worker this task holds
+        ctx.bot.pipeline.delegate(asyncio.current_task(), task)
+        try:
+            return await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            if not task.cancelled():
+                # Raised by the callback itself
+                raise
+            raise CommandTimeout(self, timeout) from None
 
     async def reinvoke(self, ctx, *, call_hooks=False):
         ctx.command = self
@@ -965,19 +1180,17 @@ class Command(_BaseCommand):
             if not await ctx.bot.can_run(ctx):
                 raise CheckFailure('The global check functions for command {0.qualified_name} failed.'.format(self))
 
+            predicates = self.checks
             cog = self.cog
             if cog is not None:
                 local_check = Cog._get_overridden_method(cog.cog_check)
                 if local_check is not None:
-                    ret = await maybe_coroutine(local_check, ctx)
-                    if not ret:
-                        return False
+                    predicates = [local_check] + predicates
 
-            predicates = self.checks
             if not predicates:
                 return True
 
-            return await async_all(predicate(ctx) for predicate in predicates)
+            return await run_checks(ctx, predicates, concurrent=ctx.bot.concurrent_checks)
         finally:
             ctx.command = original
 
@@ -1015,9 +1228,45 @@ def cooldown(rate, per, type=BucketType.default):
 
     def decorator(func):
         if isinstance(func, Command):
-            func._buckets = CooldownMapping(Cooldown(rate, per, type))
+            func._buckets = CooldownMapping(Cooldown(rate, per, type), _cooldown_namespace(func.callback))
         else:
             func.__commands_cooldown__ = Cooldown(rate, per, type)
         return func
 
     return decorator
+
+
+def max_concurrency(number, per=BucketType.default, *, wait=False):
+    """A decorator that adds a maximum concurrency to a :class:`.Command` or its subclasses.
+
+    This enables you to only allow a certain number of command invocations at the same time,
+    for example if a command takes too long or if only one user can use it at a time. This
+    differs from a cooldown in that there is no set waiting period or token bucket -- only
+    a set number of people can run the command.
+
+    The slot is taken after the checks pass and is given back once the command and its
+    after invoke hooks are done, whether they failed or not.
+
+    Parameters
+    -------------
+    number: :class:`int`
+        The maximum number of invocations of this command that can be running at the same time.
+    per: ``BucketType``
+        The bucket that this concurrency is based on, e.g. ``BucketType.conversation`` would allow
+        it to be used up to ``number`` times per conversation.
+    wait: :class:`bool`
+        Whether the command should wait for the queue to be over. If this is set to ``False``
+        then instead of waiting until the command can run again, the command raises
+        :exc:`.MaxConcurrencyReached` to its error handler. If this is set to ``True``
+        then the command waits until it can be executed.
+    """
+
+    def decorator(func):
+        value = MaxConcurrency(number, per=per, wait=wait)
+        if isinstance(func, Command):
+            func._max_concurrency = value
+        else:
+            func.__commands_max_concurrency__ = value
+        return func
+
+    return decorator
@@ -14,6 +14,9 @@ class Context(Messageable):
         self.invoked_subcommand = attrs.pop('invoked_subcommand', None)
         self.subcommand_passed = attrs.pop('subcommand_passed', None)
         self.command_failed = attrs.pop('command_failed', False)
+        self.check_results = {}
+        self._concurrency = None
+        self.elapsed = None
 
     async def invoke(self, *args, **kwargs):
         try:
@@ -1,6 +1,13 @@
+import asyncio
+import heapq
+import itertools
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
+from tg_botting.exceptions import MaxConcurrencyReached
+
 
 class BucketType(Enum):
     """Represents type of cooldown bucket"""
@@ -10,7 +17,17 @@ class BucketType(Enum):
     member = 3         #: Per-member basis. Member here is user in conversation. Same user will be able to use the command in another conversation and that will count towards different bucket.
 
 
+def _bucket_key(bucket_type, msg):
+    if bucket_type is BucketType.user:
+        return msg.user.id
+    elif bucket_type is BucketType.conversation:
+        return msg.chat.id
+    elif bucket_type is BucketType.member:
+        return msg.chat.id, msg.user.id
+
+
 class Cooldown:
+    __slots__ = ('rate', 'per', 'type', '_window', '_tokens', '_last')
 
     def __init__(self, rate, per, type):
         self.rate = int(rate)
@@ -54,53 +71,312 @@ class Cooldown:
         return '<Cooldown rate: {0.rate} per: {0.per} window: {0._window} tokens: {0._tokens}>'.format(self)
 
 
-class CooldownMapping:
-    def __init__(self, original):
+class CooldownStore:
+    """The interface for keeping cooldown buckets.
+
+    A store keeps the bucket of every key, created from the command's
+    :class:`Cooldown` if there is none yet, and drops the buckets that
+    expired. Buckets of different commands are told apart by ``namespace``.
+    Pass a store shared by several processes as the ``cooldown_store``
+    option of the bot to enforce cooldowns across all of them.
+
+    Every method is a coroutine, so a store doing I/O must not block the event loop.
+    """
+
+    async def update_rate_limit(self, namespace, key, cooldown, current=None):
+        """|coro|
+
+        Uses a token of the bucket of ``key`` like :meth:`Cooldown.update_rate_limit`
+        and returns the seconds to wait if there was none left. The update must be atomic."""
+        raise NotImplementedError('Derived classes need to implement this.')
+
+    async def get_tokens(self, namespace, key, cooldown, current=None):
+        """|coro|
+
+        Returns the tokens left in the bucket of ``key``."""
+        raise NotImplementedError('Derived classes need to implement this.')
+
+    async def reset(self, namespace, key, cooldown):
+        """|coro|
+
+        Fills the bucket of ``key`` up again."""
+        raise NotImplementedError('Derived classes need to implement this.')
+
+    async def expire(self, current=None):
+        """|coro|
+
+        Drops every bucket that was not used within its ``per`` before ``current``."""
+        raise NotImplementedError('Derived classes need to implement this.')
+
+
+class MemoryCooldownStore(CooldownStore):
+    """Keeps buckets in memory, i.e. per process. This is the default."""
+
+    def __init__(self):
         self._cache = {}
-        self._cooldown = original
+        # One (expiry, sequence, key) entry per bucket, so expired buckets are found without scanning them all
+        self._expiry = []
+        self._sequence = itertools.count()
 
     def copy(self):
-        ret = CooldownMapping(self._cooldown)
+        ret = MemoryCooldownStore()
         ret._cache = self._cache.copy()
+        ret._expiry = self._expiry.copy()
+        ret._sequence = self._sequence
+        return ret
+
+    def _expire(self, current=None):
+        current = current or time.time()
+        expiry = self._expiry
+        cache = self._cache
+        while expiry and current > expiry[0][0]:
+            _, _, key = heapq.heappop(expiry)
+            bucket = cache.get(key)
+            if bucket is None:
+                continue
+            expires = bucket._last + bucket.per
+            if current > expires:
+                del cache[key]
+            else:
+                # Used since the entry was pushed, so it is checked again when its new expiry passes
+                heapq.heappush(expiry, (expires, next(self._sequence), key))
+
+    def get_bucket(self, namespace, key, cooldown, current=None):
+        """Returns the :class:`Cooldown` kept for ``key``, without waiting."""
+        self._expire(current)
+        key = (namespace, key)
+        bucket = self._cache.get(key)
+        if bucket is None:
+            bucket = self._cache[key] = cooldown.copy()
+            heapq.heappush(self._expiry, (bucket._last + bucket.per, next(self._sequence), key))
+        return bucket
+
+    async def update_rate_limit(self, namespace, key, cooldown, current=None):
+        return self.get_bucket(namespace, key, cooldown, current).update_rate_limit(current)
+
+    async def get_tokens(self, namespace, key, cooldown, current=None):
+        return self.get_bucket(namespace, key, cooldown, current).get_tokens(current)
+
+    async def reset(self, namespace, key, cooldown):
+        self.get_bucket(namespace, key, cooldown).reset()
+
+    async def expire(self, current=None):
+        self._expire(current)
+
+
+class SQLiteCooldownStore(CooldownStore):
+    """Keeps buckets in an SQLite database in WAL mode, so every process on
+    the host using the same file shares them.
+
+    Every update of a bucket is a single ``BEGIN IMMEDIATE`` transaction, so
+    concurrent updates from several processes never lose a use. The database
+    is only used from a thread of its own, so waiting for its lock does not
+    block the event loop.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        Path of the database file. It is created if it does not exist.
+    expire_interval: :class:`float`
+        Seconds between deleting expired buckets, which is done in one statement. Defaults to 60.
+    timeout: :class:`float`
+        Seconds to wait for another process holding the database lock. Defaults to 5.
+    """
+
+    def __init__(self, path, expire_interval=60.0, timeout=5.0):
+        self.path = path
+        self.expire_interval = expire_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tg_botting_cooldowns')
+        self._connection = self._executor.submit(self._connect, path, timeout).result()
+        self._next_expire = 0.0
+
+    @staticmethod
+    def _connect(path, timeout):
+        connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('CREATE TABLE IF NOT EXISTS cooldowns (namespace TEXT NOT NULL, key TEXT NOT NULL, '
+                           'window REAL NOT NULL, tokens INTEGER NOT NULL, last REAL NOT NULL, '
+                           'expires REAL NOT NULL, PRIMARY KEY (namespace, key))')
+        connection.execute('CREATE INDEX IF NOT EXISTS cooldowns_expires ON cooldowns (expires)')
+        return connection
+
+    def close(self):
+        self._executor.submit(self._connection.close).result()
+        self._executor.shutdown()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def update_rate_limit(self, namespace, key, cooldown, current=None):
+        return await self._run(self._update_rate_limit, namespace, repr(key), cooldown, current or time.time())
+
+    async def get_tokens(self, namespace, key, cooldown, current=None):
+        return await self._run(self._get_tokens, namespace, repr(key), cooldown, current)
+
+    async def reset(self, namespace, key, cooldown):
+        await self._run(self._reset, namespace, repr(key))
+
+    async def expire(self, current=None):
+        await self._run(self._expire, current or time.time())
+
+    # The methods below run on the store's thread
+
+    def _expire(self, current):
+        self._connection.execute('DELETE FROM cooldowns WHERE expires < ?', (current,))
+        self._next_expire = current + self.expire_interval
+
+    def _load(self, namespace, key, cooldown):
+        bucket = cooldown.copy()
+        row = self._connection.execute('SELECT window, tokens, last FROM cooldowns WHERE namespace = ? AND key = ?',
+                                       (namespace, key)).fetchone()
+        if row is not None:
+            bucket._window, bucket._tokens, bucket._last = row
+        return bucket
+
+    def _update_rate_limit(self, namespace, key, cooldown, current):
+        if current >= self._next_expire:
+            self._expire(current)
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            bucket = self._load(namespace, key, cooldown)
+            retry_after = bucket.update_rate_limit(current)
+            connection.execute('INSERT OR REPLACE INTO cooldowns VALUES (?, ?, ?, ?, ?, ?)',
+                               (namespace, key, bucket._window, bucket._tokens, bucket._last,
+                                bucket._last + bucket.per))
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return retry_after
+
+    def _get_tokens(self, namespace, key, cooldown, current):
+        return self._load(namespace, key, cooldown).get_tokens(current)
+
+    def _reset(self, namespace, key):
+        # A bucket that is not stored starts out full, exactly like a reset one
+        self._connection.execute('DELETE FROM cooldowns WHERE namespace = ? AND key = ?', (namespace, key))
+
+
+class CooldownMapping:
+    def __init__(self, original, namespace=None):
+        self._cooldown = original
+        self.namespace = namespace
+        self._store = MemoryCooldownStore()
+
+    def copy(self):
+        ret = CooldownMapping(self._cooldown, self.namespace)
+        ret._store = self._store.copy()
         return ret
 
     @property
     def valid(self):
         return self._cooldown is not None
 
+    @property
+    def cooldown(self):
+        return self._cooldown
+
     @classmethod
     def from_cooldown(cls, rate, per, type):
         return cls(Cooldown(rate, per, type))
 
     def _bucket_key(self, msg):
-        bucket_type = self._cooldown.type
-        if bucket_type is BucketType.user:
-            return msg.from_id
-        elif bucket_type is BucketType.conversation:
-            return msg.peer_id
-        elif bucket_type is BucketType.member:
-            return msg.peer_id, msg.from_id
-
-    def _verify_cache_integrity(self, current=None):
-        current = current or time.time()
-        dead_keys = [k for k, v in self._cache.items() if current > v._last + v.per]
-        for k in dead_keys:
-            del self._cache[k]
-
-    def get_bucket(self, message, current=None):
-        if self._cooldown.type is BucketType.default:
-            return self._cooldown
-
-        self._verify_cache_integrity(current)
-        key = self._bucket_key(message)
-        if key not in self._cache:
-            bucket = self._cooldown.copy()
-            self._cache[key] = bucket
+        return _bucket_key(self._cooldown.type, msg)
+
+    def get_bucket(self, message, current=None, store=None):
+        """Returns the bucket of ``message``, kept by ``store`` if given or in this mapping otherwise.
+
+        Only buckets kept in memory can be returned without waiting, so ``store``
+        must be a :class:`MemoryCooldownStore`.
+        """
+        if store is None:
+            if self._cooldown.type is BucketType.default:
+                return self._cooldown
+            store = self._store
+        elif not isinstance(store, MemoryCooldownStore):
+            raise TypeError('{} can only be used asynchronously, e.g. through Command.is_on_cooldown_async '
+                            'and Command.reset_cooldown_async'.format(store.__class__.__name__))
+        return store.get_bucket(self.namespace, self._bucket_key(message), self._cooldown, current)
+
+    async def update_rate_limit(self, message, current=None, store=None):
+        """Uses a token of the bucket of ``message``, kept by ``store`` if given or
+        in this mapping otherwise, and returns the seconds to wait if there was none left."""
+        if store is None:
+            return self.get_bucket(message, current).update_rate_limit(current)
+        return await store.update_rate_limit(self.namespace, self._bucket_key(message), self._cooldown, current)
+
+    async def get_tokens(self, message, current=None, store=None):
+        if store is None:
+            return self.get_bucket(message, current).get_tokens(current)
+        return await store.get_tokens(self.namespace, self._bucket_key(message), self._cooldown, current)
+
+    async def reset(self, message, store=None):
+        if store is None:
+            self.get_bucket(message).reset()
         else:
-            bucket = self._cache[key]
+            await store.reset(self.namespace, self._bucket_key(message), self._cooldown)
 
-        return bucket
 
-    def update_rate_limit(self, message, current=None):
-        bucket = self.get_bucket(message, current)
-        return bucket.update_rate_limit(current)
+class MaxConcurrency:
+    __slots__ = ('number', 'per', 'wait', '_mapping')
+
+    def __init__(self, number, *, per, wait):
+        self._mapping = {}
+        self.per = per
+        self.number = number
+        self.wait = wait
+
+        if not isinstance(number, int):
+            raise TypeError("max_concurrency 'number' must be of type int, not {}".format(type(number)))
+        if number <= 0:
+            raise ValueError("max_concurrency 'number' cannot be less than 1")
+        if not isinstance(per, BucketType):
+            raise TypeError("max_concurrency 'per' must be of type BucketType, not {}".format(type(per)))
+
+    def copy(self):
+        return self.__class__(self.number, per=self.per, wait=self.wait)
+
+    def __repr__(self):
+        return '<MaxConcurrency per={0.per!r} number={0.number} wait={0.wait}>'.format(self)
+
+    async def acquire(self, message):
+        """Takes a slot of the bucket of ``message``, waiting for one if :attr:`wait` is set.
+
+        Returns the key to pass to :meth:`release`.
+
+        Raises
+        -------
+        MaxConcurrencyReached
+            If all slots are taken and :attr:`wait` is not set.
+        """
+        key = _bucket_key(self.per, message)
+        entry = self._mapping.get(key)
+        if entry is None:
+            # The semaphore and the number of invocations holding or waiting for it
+            entry = self._mapping[key] = [asyncio.Semaphore(self.number), 0]
+        semaphore = entry[0]
+        if not self.wait and semaphore.locked():
+            raise MaxConcurrencyReached(self.number, self.per)
+
+        entry[1] += 1
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._forget(key, entry)
+            raise
+        return key
+
+    def release(self, key):
+        entry = self._mapping.get(key)
+        if entry is None:
+            return
+        entry[0].release()
+        self._forget(key, entry)
+
+    def _forget(self, key, entry):
+        # Buckets nobody holds or waits for are dropped, so idle users and chats take no memory
+        entry[1] -= 1
+        if not entry[1]:
+            del self._mapping[key]
@@ -29,6 +29,37 @@ class TGApiError(TGException):
     pass
 
 
+class AmbiguousRequestError(TGApiError):
+    """Exception raised when a non-idempotent call failed after it was sent,
+    so TG API may or may not have processed it. It is not retried to avoid
+    e.g. sending a message twice.
+
+    This inherits from :exc:`TGApiError`
+
+    Attributes
+    -----------
+    method: :class:`str`
+        The TG API method that was called.
+    original
+        The original exception that was raised, or a :exc:`TGApiError` describing
+        the server error or non-JSON response that was received. You can also get
+        this via the ``__cause__`` attribute.
+    """
+    def __init__(self, method, original):
+        self.method = method
+        self.original = original
+        super().__init__('TG API call {0} failed after it was sent: {1.__class__.__name__}: {1}'.format(method, original))
+
+
+class CircuitBreakerOpen(TGApiError):
+    """Exception raised when a call is refused because TG API kept failing
+    and the client's :class:`.CircuitBreaker` is open.
+
+    This inherits from :exc:`TGApiError`
+    """
+    pass
+
+
 class CommandError(TGException):
     r"""The base exception type for all command related errors.
 
@@ -83,6 +114,43 @@ class CommandOnCooldown(CommandError):
         super().__init__('You are on cooldown. Try again in {:.2f}s'.format(retry_after))
 
 
+class MaxConcurrencyReached(CommandError):
+    """Exception raised when the command being invoked has reached its maximum concurrency.
+    This inherits from :exc:`CommandError`
+
+    Attributes
+    -----------
+    number: :class:`int`
+        The maximum number of concurrent invokers allowed.
+    per: BucketType
+        The bucket type passed to the :func:`.max_concurrency` decorator.
+    """
+    def __init__(self, number, per):
+        self.number = number
+        self.per = per
+        suffix = 'per %s' % per.name if per is not per.default else 'globally'
+        plural = '%s times %s' if number > 1 else '%s time %s'
+        fmt = plural % (number, suffix)
+        super().__init__('Too many people are using this command. It can only be used {} concurrently.'.format(fmt))
+
+
+class CommandTimeout(CommandError):
+    """Exception raised when the callback of a command did not finish within its timeout.
+    This inherits from :exc:`CommandError`
+
+    Attributes
+    -----------
+    command: :class:`.Command`
+        The command that timed out.
+    timeout: :class:`float`
+        The timeout in seconds.
+    """
+    def __init__(self, command, timeout):
+        self.command = command
+        self.timeout = timeout
+        super().__init__('Command {} did not finish within {:.2f}s'.format(command.qualified_name, timeout))
+
+
 class CheckFailure(CommandError):
     """Exception raised when the predicates in :attr:`.Command.checks` have failed.
 
@@ -1,4 +1,4 @@
-from copy import deepcopy
+from tg_botting.utils import freeze
 
 
 class Group:
@@ -19,9 +19,13 @@ class Group:
     photo: :class:`dict`
         Has group photo urls with different sizes
     """
+    __slots__ = (
+        'original_data', 'id', 'is_bot', 'first_name', 'last_name', 'username', 'language_code', 'is_premium',
+        'added_to_attachment_menu', 'can_join_groups', 'can_read_all_group_messages', 'supports_inline_queries'
+    )
 
     def __init__(self, data):
-        self.original_data = deepcopy(data)
+        self.original_data = freeze(data)
         self._unpack(data)
 
     def _unpack(self, data):
@@ -38,6 +42,7 @@ class Group:
         self.supports_inline_queries = data.get('supports_inline_queries') if 'supports_inline_queries' in data else False
 
 class Comments:
+    __slots__ = ('count', 'can_post', 'groups_can_post', 'can_close', 'can_open')
 
     def __init__(self, data):
         self._unpack(data)
@@ -51,6 +56,7 @@ class Comments:
 
 
 class Likes:
+    __slots__ = ('count', 'user_likes', 'can_like', 'can_publish')
 
     def __init__(self, data):
         self._unpack(data)
@@ -63,6 +69,7 @@ class Likes:
 
 
 class Reposts:
+    __slots__ = ('count', 'user_reposted')
 
     def __init__(self, data):
         self._unpack(data)
@@ -73,6 +80,7 @@ class Reposts:
 
 
 class Views:
+    __slots__ = ('count',)
 
     def __init__(self, data):
         self._unpack(data)
@@ -82,6 +90,7 @@ class Views:
 
 
 class Geo:
+    __slots__ = ('type', 'coordinates', 'place')
 
     def __init__(self, data):
         self._unpack(data)
@@ -93,6 +102,7 @@ class Geo:
 
 
 class Thread:
+    __slots__ = ('count', 'items', 'can_post', 'show_reply_button', 'groups_can_post')
 
     def __init__(self, data):
         self._unpack(data)
@@ -106,6 +116,10 @@ class Thread:
 
 
 class WallComment:
+    __slots__ = (
+        'id', 'from_id', 'date', 'text', 'reply_to_user', 'reply_to_comment', 'attachments', 'parents_stack', 'thread',
+        'post_id', 'post_owner_id'
+    )
 
     def __init__(self, data):
         self._unpack(data)
@@ -125,6 +139,7 @@ class WallComment:
 
 
 class DeletedWallComment:
+    __slots__ = ('owner_id', 'id', 'deleter_id', 'post_id')
 
     def __init__(self, data):
         self._unpack(data)
@@ -137,6 +152,10 @@ class DeletedWallComment:
 
 
 class MarketComment:
+    __slots__ = (
+        'id', 'from_id', 'date', 'text', 'reply_to_user', 'reply_to_comment', 'attachments', 'parents_stack', 'thread',
+        'market_owner_id', 'item_id'
+    )
 
     def __init__(self, data):
         self._unpack(data)
@@ -156,6 +175,7 @@ class MarketComment:
 
 
 class DeletedMarketComment:
+    __slots__ = ('owner_id', 'id', 'user_id', 'deleter_id', 'item_id')
 
     def __init__(self, data):
         self._unpack(data)
@@ -169,6 +189,10 @@ class DeletedMarketComment:
 
 
 class VideoComment:
+    __slots__ = (
+        'id', 'from_id', 'date', 'text', 'reply_to_user', 'reply_to_comment', 'attachments', 'parents_stack', 'thread',
+        'video_id', 'video_owner_id'
+    )
 
     def __init__(self, data):
         self._unpack(data)
@@ -188,6 +212,7 @@ class VideoComment:
 
 
 class DeletedVideoComment:
+    __slots__ = ('owner_id', 'id', 'user_id', 'deleter_id', 'video_id')
 
     def __init__(self, data):
         self._unpack(data)
@@ -201,6 +226,10 @@ class DeletedVideoComment:
 
 
 class PhotoComment:
+    __slots__ = (
+        'id', 'from_id', 'date', 'text', 'reply_to_user', 'reply_to_comment', 'attachments', 'parents_stack', 'thread',
+        'photo_id', 'photo_owner_id'
+    )
 
     def __init__(self, data):
         self._unpack(data)
@@ -220,6 +249,7 @@ class PhotoComment:
 
 
 class DeletedPhotoComment:
+    __slots__ = ('owner_id', 'id', 'user_id', 'deleter_id', 'photo_id')
 
     def __init__(self, data):
         self._unpack(data)
@@ -233,6 +263,11 @@ class DeletedPhotoComment:
 
 
 class Post:
+    __slots__ = (
+        'id', 'from_id', 'owner_id', 'date', 'marked_as_ads', 'post_type', 'text', 'can_pin', 'can_edit', 'created_by',
+        'can_delete', 'comments', 'is_favorite', 'likes', 'reposts', 'views', 'attachments', 'geo', 'signer_id',
+        'copy_history', 'is_pinned', 'postponed_id'
+    )
 
     def __init__(self, data):
         self._unpack(data)
@@ -263,6 +298,7 @@ class Post:
 
 
 class BoardComment:
+    __slots__ = ('id', 'from_id', 'date', 'text', 'attachments', 'likes', 'topic_id', 'topic_owner_id')
 
     def __init__(self, data):
         self._unpack(data)
@@ -279,6 +315,7 @@ class BoardComment:
 
 
 class DeletedBoardComment:
+    __slots__ = ('topic_owner_id', 'topic_id', 'id')
 
     def __init__(self, data):
         self._unpack(data)
@@ -290,6 +327,7 @@ class DeletedBoardComment:
 
 
 class PollVote:
+    __slots__ = ('owner_id', 'poll_id', 'option_id', 'user_id')
 
     def __init__(self, data):
         self._unpack(data)
@@ -302,6 +340,7 @@ class PollVote:
 
 
 class OfficersEdit:
+    __slots__ = ('admin_id', 'user_id', 'level_old', 'level_new')
 
     def __init__(self, data):
         self._unpack(data)
@@ -0,0 +1,81 @@
+import contextvars
+import time
+from collections import OrderedDict
+
+from tg_botting.utils import freeze, DataView, _MISSING
+
+
+_current = contextvars.ContextVar('tg_botting_identity_map', default=None)
+
+
+class IdentityMap:
+    """Shares one instance per id between all objects built from updates.
+
+    While a map is active, building a user or chat from data with an ``id``
+    returns the instance already built for that id, so the same user or chat
+    is the same object in every update and can be compared with ``is``.
+    A client activates its map for the tasks it runs, so several clients in
+    one process never share instances.
+
+    The instance is refreshed in place with the keys present in the new data.
+    Keys the new data lacks are kept, so the small chat object inside a message
+    does not wipe e.g. the description of a chat fetched with ``getChat``.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        Number of instances kept. The least recently seen one is dropped first. Defaults to 10000.
+    ttl: :class:`float`
+        Seconds an instance is kept after it was last seen. Defaults to 3600.
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def activate(self):
+        """Makes this map used by objects built in the current task and the tasks it creates from now on.
+
+        Returns a token to pass to :meth:`deactivate`.
+        """
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def intern(self, cls, data, factory):
+        object_id = data.get('id')
+        if object_id is None:
+            return factory(data)
+        key = (cls, object_id)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            obj = entry[0]
+            if isinstance(data, DataView):
+                data = data._data
+            current = obj.original_data._data
+            if any(current.get(key, _MISSING) != value for key, value in data.items()):
+                merged = dict(current)
+                merged.update(data)
+                obj.original_data = freeze(merged)
+                obj._unpack(merged)
+            entry[1] = now + self.ttl
+            self._entries.move_to_end(key)
+            return obj
+        obj = factory(data)
+        self._entries[key] = [obj, now + self.ttl]
+        self._entries.move_to_end(key)
+        # Entries are kept in the order they were last seen, which is also the order they expire in
+        entries = self._entries
+        while entries and (len(entries) > self.maxsize or next(iter(entries.values()))[1] <= now):
+            entries.popitem(last=False)
+        return obj
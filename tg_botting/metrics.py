@@ -0,0 +1,141 @@
+from bisect import bisect_left
+
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Counts observed values into fixed buckets.
+
+    The counts are allocated once, so an observation is a binary search and
+    three additions. Buckets are stored per interval and only made cumulative
+    when exported.
+    """
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Returns ``(upper bound, count of values up to it)`` pairs, ending with ``inf``."""
+        total = 0
+        result = []
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(key, _escape(value)) for key, value in pairs) + '}'
+
+
+def _snapshot_key(labels):
+    return ','.join('{}={}'.format(key, value) for key, value in labels)
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+class MetricsRegistry:
+    """Collects counters and histograms about command invocations.
+
+    The bot feeds it automatically, see :attr:`.Bot.metrics`. Everything runs
+    on the event loop, so updates take no locks. Metrics are identified by a
+    name and a tuple of ``(label, value)`` pairs.
+
+    The bot records:
+
+    - ``command_calls_total``, ``command_errors_total`` and ``command_cooldowns_total`` counters
+      labelled with the ``command`` and, for errors, the ``error`` class.
+    - ``command_check_seconds``, ``command_parse_seconds`` and ``command_callback_seconds``
+      histograms labelled with the ``command``.
+
+    Parameters
+    ----------
+    buckets: Tuple[:class:`float`]
+        Upper bounds of the histogram buckets in seconds, in increasing order.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, labels=(), value=1):
+        """Adds ``value`` to a counter."""
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        """Records ``value`` in a histogram."""
+        key = (name, labels)
+        try:
+            histogram = self.histograms[key]
+        except KeyError:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def clear(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self):
+        """Returns the current values as a :class:`dict`.
+
+        Counters map to their value and histograms to a :class:`dict` with the
+        ``count``, ``sum`` and cumulative ``buckets``, both grouped by metric
+        name and then by their labels joined into a string like
+        ``command=ping,error=BadArgument``, so the snapshot can be dumped as JSON.
+        The last bucket bound is ``'+Inf'``.
+        """
+        result = {'counters': {}, 'histograms': {}}
+        for (name, labels), value in self.counters.items():
+            result['counters'].setdefault(name, {})[_snapshot_key(labels)] = value
+        for (name, labels), histogram in self.histograms.items():
+            result['histograms'].setdefault(name, {})[_snapshot_key(labels)] = {
+                'count': histogram.count,
+                'sum': histogram.sum,
+                # The last bound is written the way Prometheus does, JSON has no infinity
+                'buckets': [(bound if bound != float('inf') else '+Inf', count)
+                            for bound, count in histogram.cumulative()]
+            }
+        return result
+
+    def to_prometheus(self, prefix='tg_botting_'):
+        """Returns the current values in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            name = prefix + name
+            if name not in typed:
+                typed.add(name)
+                lines.append('# TYPE {} counter'.format(name))
+            lines.append('{}{} {}'.format(name, _format_labels(labels), value))
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            name = prefix + name
+            if name not in typed:
+                typed.add(name)
+                lines.append('# TYPE {} histogram'.format(name))
+            for bound, count in histogram.cumulative():
+                lines.append('{}_bucket{} {}'.format(name, _format_labels(labels, (('le', _format_bound(bound)),)),
+                                                     count))
+            lines.append('{}_sum{} {}'.format(name, _format_labels(labels), repr(histogram.sum)))
+            lines.append('{}_count{} {}'.format(name, _format_labels(labels), histogram.count))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,57 @@
+import os
+
+
+class OffsetStore:
+    """The interface for storing the update offset between restarts.
+
+    The client loads the offset once on startup and saves it every time all
+    updates before it have been handled, so updates that were fetched but not
+    handled yet are fetched again after a crash.
+    """
+
+    def load(self):
+        """Returns the saved offset or ``None`` if there is none."""
+        raise NotImplementedError('Derived classes need to implement this.')
+
+    def save(self, offset):
+        """Saves ``offset``."""
+        raise NotImplementedError('Derived classes need to implement this.')
+
+
+class MemoryOffsetStore(OffsetStore):
+    """Keeps the offset in memory only, i.e. does not persist it across restarts."""
+
+    def __init__(self):
+        self.offset = None
+
+    def load(self):
+        return self.offset
+
+    def save(self, offset):
+        self.offset = offset
+
+
+class FileOffsetStore(OffsetStore):
+    """Keeps the offset in a plain text file.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        Path of the file. It is replaced atomically on every save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def save(self, offset):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(str(offset))
+        os.replace(tmp, self.path)
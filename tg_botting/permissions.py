@@ -1,29 +1,23 @@
-from copy import deepcopy
+from tg_botting.schema import TGObject, Field
 
 
-class ChatPermissions:
-
-    def __init__(self, data):
-        self.original_data = deepcopy(data)
-        self._unpack(data)
-
-    def _unpack(self, data):
-        self.can_send_messages = data.get('can_send_messages') if "can_send_messages" in data else False
-        self.can_send_audios = data.get('can_send_audios') if "can_send_audios" in data else False
-        self.can_send_documents = data.get('can_send_documents') if "can_send_documents" in data else False
-        self.can_send_photos = data.get('can_send_photos') if "can_send_photos" in data else False
-        self.can_send_videos = data.get('can_send_videos') if "can_send_videos" in data else False
-        self.can_send_video_notes = data.get('can_send_video_notes') if "can_send_video_notes" in data else False
-        self.can_send_voice_notes = data.get('can_send_voice_notes') if "can_send_voice_notes" in data else False
-        self.can_send_polls = data.get('can_send_polls') if "can_send_polls" in data else False
-        self.can_send_other_messages = data.get(
-            'can_send_other_messages') if "can_send_other_messages" in data else False
-        self.can_add_web_page_previews = data.get(
-            'can_add_web_page_previews') if "can_add_web_page_previews" in data else False
-        self.can_change_info = data.get('can_change_info') if "can_change_info" in data else False
-        self.can_invite_users = data.get('can_invite_users') if "can_invite_users" in data else False
-        self.can_pin_messages = data.get('can_pin_messages') if "can_pin_messages" in data else False
-        self.can_manage_topics = data.get('can_manage_topics') if "can_manage_topics" in data else False
+class ChatPermissions(TGObject):
+    _fields = {
+        'can_send_messages': Field(default=False),
+        'can_send_audios': Field(default=False),
+        'can_send_documents': Field(default=False),
+        'can_send_photos': Field(default=False),
+        'can_send_videos': Field(default=False),
+        'can_send_video_notes': Field(default=False),
+        'can_send_voice_notes': Field(default=False),
+        'can_send_polls': Field(default=False),
+        'can_send_other_messages': Field(default=False),
+        'can_add_web_page_previews': Field(default=False),
+        'can_change_info': Field(default=False),
+        'can_invite_users': Field(default=False),
+        'can_pin_messages': Field(default=False),
+        'can_manage_topics': Field(default=False),
+    }
 
     @classmethod
     def create(cls, can_send_messages=False, can_send_audios=False,
@@ -0,0 +1,148 @@
+import asyncio
+import sys
+import traceback
+
+
+class UpdatePipeline:
+    """A bounded stage between fetching updates and dispatching them.
+
+    Updates are put into a queue of at most ``maxsize`` entries and handled by
+    ``workers`` worker tasks. A worker takes the next update only after every
+    event handler started for the current one has finished, so at most
+    ``workers`` updates are being handled at once. When the queue is full
+    :meth:`put` waits, which pauses polling until the workers catch up.
+
+    With ``ordered`` set every worker gets its own queue and updates are
+    routed by chat (or by user for updates without a chat), so updates from
+    one chat are handled one after another in the order they came, while
+    different chats are still handled in parallel.
+
+    A handler that calls :meth:`.Client.wait_for` is released from this
+    accounting, since the update it waits for can only arrive after it.
+
+    Parameters
+    ----------
+    client: :class:`.Client`
+        The client whose updates are handled.
+    workers: :class:`int`
+        Number of updates handled concurrently. Defaults to 16.
+    maxsize: :class:`int`
+        Number of updates that can wait in the queue. In ordered mode this is
+        the size of each worker's queue. Defaults to 100.
+    ordered: :class:`bool`
+        Whether updates from the same chat are handled in order. Defaults to ``False``.
+    """
+
+    def __init__(self, client, workers=16, maxsize=100, ordered=False):
+        self.client = client
+        self.workers = workers
+        self.maxsize = maxsize
+        self.ordered = ordered
+        self.busy = 0
+        self._queues = []
+        self._tasks = []
+        self._owners = {}
+        self._next = 0
+
+    def start(self):
+        if self.ordered:
+            self._queues = [asyncio.Queue(self.maxsize) for _ in range(self.workers)]
+            self._tasks = [self.client.loop.create_task(self._worker(queue)) for queue in self._queues]
+        else:
+            queue = asyncio.Queue(self.maxsize)
+            self._queues = [queue]
+            self._tasks = [self.client.loop.create_task(self._worker(queue)) for _ in range(self.workers)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    @property
+    def depth(self):
+        """:class:`int`: Number of updates waiting in the queue."""
+        return sum(queue.qsize() for queue in self._queues)
+
+    @property
+    def utilisation(self):
+        """:class:`float`: Share of workers currently handling an update."""
+        return self.busy / self.workers
+
+    @staticmethod
+    def shard_key(update):
+        """Returns the id updates are ordered by: the chat id, or the sender id for updates
+        without a chat. ``None`` if the update has neither."""
+        for obj in update.values():
+            if not isinstance(obj, dict):
+                continue
+            chat = obj.get('chat')
+            if chat is None:
+                message = obj.get('message')
+                if isinstance(message, dict):
+                    chat = message.get('chat')
+            if chat is not None:
+                return chat.get('id')
+            user = obj.get('from') or obj.get('user')
+            if user is not None:
+                return user.get('id')
+        return None
+
+    async def put(self, update):
+        if len(self._queues) == 1:
+            return await self._queues[0].put(update)
+        key = self.shard_key(update)
+        if key is None:
+            # Nothing to keep in order with, spread those evenly
+            self._next = index = (self._next + 1) % len(self._queues)
+        else:
+            index = hash(key) % len(self._queues)
+        await self._queues[index].put(update)
+
+    def release(self, task):
+        """Stops waiting for ``task`` to finish before the worker moves on."""
+        finished = self._owners.get(task)
+        if finished is not None:
+            finished(task)
+
+    def delegate(self, task, child):
+        """Lets ``child``, a task started by ``task``, release the worker on its behalf, see :meth:`release`."""
+        finished = self._owners.get(task)
+        if finished is None:
+            return
+        self._owners[child] = lambda _: finished(task)
+        child.add_done_callback(lambda done: self._owners.pop(done, None))
+
+    def _track(self, tasks):
+        waiter = self.client.loop.create_future()
+        pending = set(tasks)
+
+        def finished(task):
+            pending.discard(task)
+            self._owners.pop(task, None)
+            if not pending and not waiter.done():
+                waiter.set_result(None)
+
+        for task in tasks:
+            self._owners[task] = finished
+            task.add_done_callback(finished)
+        return waiter
+
+    async def _process(self, update):
+        tasks = self.client._collect_events(update)
+        if tasks:
+            await self._track(tasks)
+
+    async def _worker(self, queue):
+        while True:
+            update = await queue.get()
+            update_id = update.get('update_id')
+            self.busy += 1
+            try:
+                await self._process(update)
+            except Exception as e:
+                traceback.print_exc(file=sys.stderr)
+                print('Ignoring exception in update processing:\n{}'.format(e), file=sys.stderr)
+            finally:
+                self.busy -= 1
+                queue.task_done()
+                self.client._update_done(update_id)
@@ -0,0 +1,112 @@
+import random
+import time
+
+import aiohttp
+
+
+# Methods that leave a second trace when a call reaches the server twice: another
+# message, another invite link, another topic. Everything else is safe to repeat.
+NON_IDEMPOTENT_METHODS = frozenset({
+    'sendMessage', 'forwardMessage', 'forwardMessages', 'copyMessage', 'copyMessages', 'sendPhoto',
+    'sendAudio', 'sendDocument', 'sendVideo', 'sendAnimation', 'sendVoice', 'sendVideoNote',
+    'sendMediaGroup', 'sendLocation', 'sendVenue', 'sendContact', 'sendPoll', 'sendDice', 'sendSticker',
+    'sendInvoice', 'sendGame', 'createChatInviteLink', 'createInvoiceLink', 'createForumTopic',
+    'uploadStickerFile', 'addStickerToSet',
+})
+
+
+def is_idempotent(method):
+    """Whether TG API ``method`` can be repeated without a visible side effect."""
+    return method not in NON_IDEMPOTENT_METHODS
+
+
+def is_connect_error(exc):
+    """Whether ``exc`` was raised before the request could reach the server."""
+    if isinstance(exc, aiohttp.ClientConnectorError):
+        return True
+    return isinstance(exc, aiohttp.ServerTimeoutError) and str(exc).startswith('Connection timeout')
+
+
+class RetryPolicy:
+    """Describes how a failed API call is retried.
+
+    Delays between attempts grow exponentially and are fully jittered, so
+    clients that failed together do not retry together. Waits requested by
+    Telegram through ``retry_after`` are honoured exactly instead.
+
+    Parameters
+    ----------
+    max_attempts: :class:`int`
+        How many times the call is made at most, the first attempt included. Defaults to 5.
+    base_delay: :class:`float`
+        Upper bound of the first backoff in seconds. Doubles with every attempt. Defaults to 0.5.
+    max_delay: :class:`float`
+        Upper bound of a single backoff in seconds. Defaults to 30.
+    deadline: Optional[:class:`float`]
+        Total time budget of the call in seconds, waits included. A retry that would
+        not fit into it is not made. ``None`` means no budget. Defaults to 60.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=30.0, deadline=60.0):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def __repr__(self):
+        return '<RetryPolicy max_attempts: {0.max_attempts} base_delay: {0.base_delay} ' \
+               'max_delay: {0.max_delay} deadline: {0.deadline}>'.format(self)
+
+
+class CircuitBreaker:
+    """Stops calling the API while it keeps failing.
+
+    After ``threshold`` consecutive failures the circuit opens and calls fail
+    immediately with :exc:`.CircuitBreakerOpen`. Once ``reset_timeout`` seconds
+    have passed a single trial call is let through: if it succeeds the circuit
+    closes, otherwise it stays open for another ``reset_timeout``.
+
+    The client has none by default, pass one as its ``circuit_breaker`` option
+    to enable it. Calls that raised :exc:`.AmbiguousRequestError` are not counted.
+
+    Parameters
+    ----------
+    threshold: :class:`int`
+        Consecutive failures that open the circuit. Defaults to 5.
+    reset_timeout: :class:`float`
+        Seconds the circuit stays open before a trial call. Defaults to 30.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_timeout:
+            # Re-arm so only this call goes through until it reports back
+            self.opened_at = now
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
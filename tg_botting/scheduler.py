@@ -0,0 +1,146 @@
+import asyncio
+import collections
+import time
+
+
+_CHAT_LIMITED_PREFIXES = ('send', 'forward', 'copy', 'edit')
+
+
+class _RateBucket:
+    # Sliding log of the last ``rate`` reserved send times: a call is due once the oldest of
+    # them is ``per`` seconds old, so no window of ``per`` seconds ever holds more than ``rate``
+    # calls, and calls are released strictly in the order they were reserved
+    __slots__ = ('rate', 'per', 'log')
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.log = collections.deque()
+
+    def earliest(self, now):
+        log = self.log
+        if len(log) < self.rate:
+            return now
+        return max(now, log[0] + self.per)
+
+    def reserve(self, at):
+        log = self.log
+        log.append(at)
+        if len(log) > self.rate:
+            log.popleft()
+
+    def idle(self, now):
+        return not self.log or self.log[-1] + self.per <= now
+
+
+class _ChatLimit:
+    # Buckets of a single chat and a lock that makes its calls wait their turn one by one,
+    # so each of them is logged at the time it is actually released
+    __slots__ = ('lock', 'buckets', 'users')
+
+    def __init__(self, buckets):
+        self.lock = asyncio.Lock()
+        self.buckets = buckets
+        # Calls holding or waiting for the lock. It is briefly unlocked while handed to the next waiter,
+        # so locked() alone would let a sweep drop a chat that still has calls queued
+        self.users = 0
+
+    def idle(self, now):
+        return not self.users and all(bucket.idle(now) for bucket in self.buckets)
+
+
+class SendScheduler:
+    """Smooths outgoing calls so they stay under Telegram's flood limits.
+
+    Calls that post into a chat (``send*``, ``forward*``, ``copy*`` and ``edit*`` methods)
+    are delayed until every bucket they belong to allows them: the global bucket,
+    the per-chat bucket and, for group chats, the per-group bucket. Other methods
+    are not delayed.
+
+    Parameters
+    ----------
+    global_rate: :class:`int`
+        Calls per second allowed across all chats. Defaults to 30.
+    chat_rate: :class:`int`
+        Calls per second allowed in a single chat. Defaults to 1.
+    group_rate: :class:`int`
+        Calls allowed in a single group per ``group_per`` seconds. Defaults to 20.
+    group_per: :class:`float`
+        Window of the per-group limit in seconds. Defaults to 60.
+    """
+
+    def __init__(self, global_rate=30, chat_rate=1, group_rate=20, group_per=60.0):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.group_per = group_per
+        self._global = _RateBucket(global_rate, 1.0)
+        self._chats = {}
+        self._limited = {}
+        self._calls = 0
+
+    def _is_limited(self, method):
+        try:
+            return self._limited[method]
+        except KeyError:
+            limited = self._limited[method] = method.startswith(_CHAT_LIMITED_PREFIXES)
+            return limited
+
+    @staticmethod
+    def _is_group(chat_id):
+        if isinstance(chat_id, str):
+            return chat_id.startswith('@') or chat_id.startswith('-')
+        return chat_id < 0
+
+    def _chat_limit(self, chat_id):
+        try:
+            return self._chats[chat_id]
+        except KeyError:
+            buckets = [_RateBucket(self.chat_rate, 1.0)]
+            if self._is_group(chat_id):
+                buckets.append(_RateBucket(self.group_rate, self.group_per))
+            limit = self._chats[chat_id] = _ChatLimit(buckets)
+            return limit
+
+    def _sweep(self, now):
+        idle = [k for k, v in self._chats.items() if v.idle(now)]
+        for k in idle:
+            del self._chats[k]
+
+    async def _wait_global(self):
+        now = time.monotonic()
+        start = self._global.earliest(now)
+        self._global.reserve(start)
+        if start > now:
+            await asyncio.sleep(start - now)
+        return start
+
+    async def acquire(self, method, chat_id=None):
+        """|coro|
+
+        Waits until the call is allowed to be made.
+
+        Calls into the same chat are released in order and only once the chat buckets allow them,
+        the global bucket is reserved after that, so a chat that is over its own limit never
+        holds back calls into other chats.
+        """
+        if not self._is_limited(method):
+            return
+        self._calls += 1
+        if self._calls % 1024 == 0:
+            self._sweep(time.monotonic())
+        if chat_id is None:
+            await self._wait_global()
+            return
+        limit = self._chat_limit(chat_id)
+        limit.users += 1
+        try:
+            async with limit.lock:
+                now = time.monotonic()
+                start = max(bucket.earliest(now) for bucket in limit.buckets)
+                if start > now:
+                    await asyncio.sleep(start - now)
+                released = await self._wait_global()
+                for bucket in limit.buckets:
+                    bucket.reserve(released)
+        finally:
+            limit.users -= 1
@@ -0,0 +1,126 @@
+import abc
+
+from tg_botting.identity import _current as _current_identity_map
+from tg_botting.utils import freeze
+
+
+class Field:
+    """Describes how one attribute of a TG object is read from API data.
+
+    Parameters
+    ----------
+    convert: Optional[Callable]
+        Called with the value when it is present and not ``None``, e.g. a TG object class.
+    key: Optional[:class:`str`]
+        Key in the API data. Defaults to the attribute name.
+    default
+        Value used when the key is missing or ``None``.
+    factory: Optional[Callable]
+        Called without arguments to build the default instead, for mutable defaults.
+    """
+    __slots__ = ('convert', 'key', 'default', 'factory')
+
+    def __init__(self, convert=None, *, key=None, default=None, factory=None):
+        self.convert = convert
+        self.key = key
+        self.default = default
+        self.factory = factory
+
+    def extract(self, data, name):
+        value = data.get(self.key or name)
+        if value is None:
+            return self.factory() if self.factory is not None else self.default
+        if self.convert is not None:
+            return self.convert(value)
+        return value
+
+
+def list_of(convert):
+    """Returns a converter that applies ``convert`` to every item of a list."""
+    def converter(value):
+        return [convert(r) for r in value]
+    return converter
+
+
+def _generate_unpack(name, fields):
+    lines = ['def _unpack(self, data):', '    get = data.get']
+    namespace = {}
+    for i, (attr, field) in enumerate(fields.items()):
+        key = field.key or attr
+        if field.factory is not None:
+            default = '_f{}()'.format(i)
+            namespace['_f{}'.format(i)] = field.factory
+        else:
+            default = '_d{}'.format(i)
+            namespace[default] = field.default
+        if field.convert is None and field.factory is None:
+            # Plain values need no None check, so a single get with a default does it
+            lines.append('    self.{} = get({!r}, {})'.format(attr, key, default))
+            continue
+        value = 'v'
+        if field.convert is not None:
+            value = '_c{}(v)'.format(i)
+            namespace['_c{}'.format(i)] = field.convert
+        lines.append('    v = get({!r})'.format(key))
+        lines.append('    self.{} = {} if v is not None else {}'.format(attr, value, default))
+    exec(compile('\n'.join(lines), '<unpack {}>'.format(name), 'exec'), namespace)
+    return namespace['_unpack']
+
+
+class ObjectMeta(abc.ABCMeta):
+    """Builds TG object classes from their ``_fields`` table.
+
+    Every attribute in the table gets a slot, and ``_unpack`` is generated
+    once per class from the table merged with the ones of its bases, reading
+    each key with a single lookup.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        fields = {}
+        for base in reversed(bases):
+            fields.update(getattr(base, '_all_fields', {}))
+        own = namespace.get('_fields', {})
+        fields.update(own)
+        inherited = set()
+        for base in bases:
+            for klass in base.__mro__:
+                inherited.update(getattr(klass, '__slots__', ()))
+        if '_fields' in namespace:
+            slots = list(namespace.get('__slots__', ()))
+            for attr in ('original_data',) + tuple(own):
+                if attr not in inherited and attr not in slots:
+                    slots.append(attr)
+            namespace['__slots__'] = tuple(slots)
+        namespace['_all_fields'] = fields
+        if '_unpack' not in namespace:
+            namespace['_unpack'] = _generate_unpack(name, fields)
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class InternedMeta(ObjectMeta):
+    """An :class:`ObjectMeta` for classes built through the active :class:`.IdentityMap`, if any.
+
+    Kept apart so building the other classes does not pay for the check.
+    """
+
+    def __call__(cls, data, *args, **kwargs):
+        identity_map = _current_identity_map.get()
+        if identity_map is None or data is None:
+            return super().__call__(data, *args, **kwargs)
+        return identity_map.intern(cls, data, super().__call__)
+
+
+class TGObject(metaclass=ObjectMeta):
+    """Base of the TG objects built from API data.
+
+    Subclasses describe their attributes in a ``_fields`` mapping of attribute
+    name to :class:`Field`. The data is kept as :attr:`original_data`.
+
+    Classes created with :class:`InternedMeta` are built through the active
+    :class:`.IdentityMap`, if any.
+    """
+    __slots__ = ()
+
+    def __init__(self, data):
+        self.original_data = freeze(data)
+        self._unpack(data)
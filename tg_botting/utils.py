@@ -1,9 +1,15 @@
+import asyncio
+from collections.abc import Mapping, Sequence
+from copy import deepcopy
 from inspect import isawaitable
 import json
 
 
 
 
+_MISSING = object()
+
+
 async def async_all(gen, *, check=isawaitable):
     for elem in gen:
         if check(elem):
@@ -13,6 +19,59 @@ async def async_all(gen, *, check=isawaitable):
     return True
 
 
+async def run_checks(ctx, predicates, *, concurrent=False):
+    """Returns whether all check ``predicates`` pass for ``ctx``.
+
+    Results are kept in ``ctx.check_results`` per check and command, so a
+    check used both globally and on the command runs once per context.
+
+    Parameters
+    -----------
+    ctx: :class:`.Context`
+        The context to run the checks with.
+    predicates: Iterable[Callable]
+        The checks, called with ``ctx``.
+    concurrent: :class:`bool`
+        Whether to run coroutine checks at the same time instead of one after another.
+        The first one to fail cancels the rest, so which failure or exception is seen
+        depends on timing rather than on the order of the checks.
+    """
+    results = ctx.check_results
+    command = ctx.command
+    pending = []
+    try:
+        for predicate in predicates:
+            key = (predicate, command)
+            value = results.get(key, _MISSING)
+            if value is _MISSING or (isinstance(value, asyncio.Future) and value.cancelled()):
+                value = predicate(ctx)
+                if isawaitable(value):
+                    if not concurrent:
+                        value = await value
+                    else:
+                        value = asyncio.ensure_future(value)
+                results[key] = value
+            if isinstance(value, asyncio.Future):
+                if not value.done():
+                    if concurrent:
+                        pending.append(value)
+                        continue
+                    await asyncio.wait((value,))
+                value = value.result()
+            if not value:
+                return False
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if not future.result():
+                    return False
+        return True
+    finally:
+        for future in pending:
+            future.cancel()
+
+
 async def maybe_coroutine(f, *args, **kwargs):
     value = f(*args, **kwargs)
     if isawaitable(value):
@@ -38,6 +97,30 @@ def get_params_from_class(params,*iskl):
 
 
 
+_slot_names = {}
+
+
+def attributes(obj):
+    """Returns the attributes set on a slotted object as a dict, like ``obj.__dict__`` would."""
+    cls = type(obj)
+    try:
+        names = _slot_names[cls]
+    except KeyError:
+        names = []
+        for klass in reversed(cls.__mro__):
+            for name in getattr(klass, '__slots__', ()):
+                if name not in names:
+                    names.append(name)
+        names = _slot_names[cls] = tuple(names)
+    res = {}
+    for name in names:
+        try:
+            res[name] = getattr(obj, name)
+        except AttributeError:
+            pass
+    return res
+
+
 def find(predicate, seq):
     for element in seq:
         if predicate(element):
@@ -45,5 +128,103 @@ def find(predicate, seq):
     return None
 
 
+class DataView(Mapping):
+    """A read-only view of decoded TG API data.
+
+    Objects keep the data they were built from as a view instead of a deep
+    copy, so every object built from one update shares the same dicts. Nested
+    dicts and lists are wrapped on access and are read-only as well.
+
+    Use :meth:`copy` to get a mutable deep copy.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return _view(self._data[key])
+
+    def get(self, key, default=None):
+        try:
+            return _view(self._data[key])
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, DataView):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{0.__class__.__name__}({0._data!r})'.format(self)
+
+    def copy(self):
+        """Returns a mutable deep copy of the data."""
+        return deepcopy(self._data)
+
+
+class ListView(Sequence):
+    """A read-only view of a list in decoded TG API data. See :class:`DataView`."""
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ListView(self._data[index])
+        return _view(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, ListView):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{0.__class__.__name__}({0._data!r})'.format(self)
+
+    def copy(self):
+        """Returns a mutable deep copy of the data."""
+        return deepcopy(self._data)
+
+
+def _view(value):
+    if isinstance(value, dict):
+        return DataView(value)
+    if isinstance(value, list):
+        return ListView(value)
+    return value
+
+
+def freeze(data):
+    """Returns a read-only view of ``data`` without copying it."""
+    if isinstance(data, (DataView, ListView)):
+        return data
+    return _view(data)
+
+
+def _unwrap(obj):
+    if isinstance(obj, (DataView, ListView)):
+        return obj._data
+    raise TypeError('Object of type {} is not JSON serializable'.format(obj.__class__.__name__))
+
+
 def to_json(obj):
-    return json.dumps(obj, separators=(',', ':'), ensure_ascii=True)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=True, default=_unwrap)